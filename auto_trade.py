@@ -1,8 +1,15 @@
-# auto_trade.py - Automated Trading Engine
+"""Automated trading engine
 
-This file runs the automated trading system during market hours, handling portfolio initialization, trade signal monitoring, and position management.
+Runs the automated trading system during market hours, handling portfolio initialization,
+trade signal monitoring and position management.
 
-```python
+Key components:
+1. Market Hours Check: Uses pytz to handle US Eastern timezone for accurate market hours
+2. Portfolio Initialization: Includes retry mechanism for reliable startup
+3. Trading Loop: Monitors signals and manages positions during market hours
+4. Error Handling: Comprehensive logging and recovery from failures
+5. Simulation Mode: Allows testing without market hour restrictions
+"""
 import logging
 import os
 from datetime import datetime, time
@@ -145,11 +152,3 @@ def run_automated_trading(simulation_mode=True):
 if __name__ == "__main__":
     # Default to simulation mode for testing
     run_automated_trading(simulation_mode=True)
-```
-
-Key Components:
-1. Market Hours Check: Uses pytz to handle US Eastern timezone for accurate market hours
-2. Portfolio Initialization: Includes retry mechanism for reliable startup
-3. Trading Loop: Monitors signals and manages positions during market hours
-4. Error Handling: Comprehensive logging and recovery from failures
-5. Simulation Mode: Allows testing without market hour restrictions
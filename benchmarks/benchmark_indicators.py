@@ -0,0 +1,173 @@
+"""Throughput and peak-memory benchmarks for the calculate_* functions in modules/technical_analysis.py
+
+    python benchmarks/benchmark_indicators.py                  # compare against the saved baseline
+    python benchmarks/benchmark_indicators.py --save           # record a new baseline
+    python benchmarks/benchmark_indicators.py --max-rows 100000
+"""
+import argparse
+import inspect
+import json
+import logging
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules import technical_analysis
+from modules.bars import compact_bars
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# A run is flagged when throughput drops or peak memory grows by more than this fraction
+DEFAULT_TOLERANCE = 0.2
+
+# Each function is timed repeatedly for at least this long (and at most MAX_REPEATS times); the best run counts
+MIN_TIME = 0.5
+MAX_REPEATS = 20
+
+SWEEP_WINDOWS = list(range(5, 205, 10))
+
+# name -> (call on a bar frame, largest row count worth running; sweeps hold rows x settings in memory)
+CASES = {
+    'calculate_macd': (lambda df: technical_analysis.calculate_macd(df['Close']), None),
+    'calculate_bollinger_bands': (lambda df: technical_analysis.calculate_bollinger_bands(df['Close']), None),
+    'calculate_atr': (lambda df: technical_analysis.calculate_atr(df), None),
+    'calculate_sma': (lambda df: technical_analysis.calculate_sma(df['Close'], 50), None),
+    'calculate_rsi': (lambda df: technical_analysis.calculate_rsi(df['Close']), None),
+    'calculate_support_resistance': (lambda df: technical_analysis.calculate_support_resistance(df), None),
+    'calculate_sma_sweep': (lambda df: technical_analysis.calculate_sma_sweep(df['Close'], SWEEP_WINDOWS), 1_000_000),
+    'calculate_rsi_sweep': (lambda df: technical_analysis.calculate_rsi_sweep(df['Close'], SWEEP_WINDOWS), 1_000_000),
+    'calculate_bollinger_sweep': (
+        lambda df: technical_analysis.calculate_bollinger_sweep(df['Close'], SWEEP_WINDOWS, [1.5, 2, 2.5]), 100_000
+    ),
+}
+
+def synthetic_bars(rows, seed=0):
+    """Random-walk OHLCV minute bars in the compact dtypes the app uses"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    spread = np.abs(rng.normal(0, 0.002, rows)) * close
+    df = pd.DataFrame({
+        'Open': close + rng.normal(0, 0.0005, rows) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(100, 100_000, rows),
+    }, index=pd.date_range('2000-01-03 09:30', periods=rows, freq='min'))
+    return compact_bars(df)
+
+def time_case(fn, df):
+    """Best wall time over repeated runs"""
+    best = float('inf')
+    total = 0.0
+    repeats = 0
+    while repeats < MAX_REPEATS and (repeats == 0 or total < MIN_TIME):
+        start = perf_counter()
+        fn(df)
+        elapsed = perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        repeats += 1
+    return best
+
+def peak_memory(fn, df):
+    """Peak bytes allocated while the function runs (NumPy buffers included)"""
+    tracemalloc.start()
+    try:
+        fn(df)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def check_coverage():
+    """Warn about calculate_* functions without a benchmark case"""
+    functions = [name for name, _ in inspect.getmembers(technical_analysis, inspect.isfunction)
+                 if name.startswith('calculate_')]
+    missing = sorted(set(functions) - set(CASES))
+    if missing:
+        logging.warning(f"No benchmark case for: {', '.join(missing)}")
+
+def run(sizes, names):
+    results = {}
+    for rows in sizes:
+        df = synthetic_bars(rows)
+        for name in names:
+            fn, max_rows = CASES[name]
+            if max_rows is not None and rows > max_rows:
+                continue
+            seconds = time_case(fn, df)
+            results[f"{name}/{rows}"] = {
+                'function': name,
+                'rows': rows,
+                'seconds': seconds,
+                'rows_per_second': rows / seconds if seconds > 0 else float('inf'),
+                'peak_bytes': peak_memory(fn, df),
+            }
+            print(f"{name:32} {rows:>10,} rows  {rows / seconds:>14,.0f} rows/s  "
+                  f"{results[f'{name}/{rows}']['peak_bytes'] / 1e6:>9.1f} MB peak")
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return a message for every case that got slower or hungrier than the baseline allows"""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if result['rows_per_second'] < previous['rows_per_second'] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {result['rows_per_second']:,.0f} rows/s "
+                               f"vs baseline {previous['rows_per_second']:,.0f}")
+        if result['peak_bytes'] > previous['peak_bytes'] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {result['peak_bytes'] / 1e6:.1f} MB "
+                               f"vs baseline {previous['peak_bytes'] / 1e6:.1f} MB")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the technical analysis indicators")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="Row counts to benchmark")
+    parser.add_argument('--max-rows', type=int, help="Skip sizes above this row count")
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help="Benchmark only these functions")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="Write the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed fractional drop in throughput or growth in peak memory")
+    args = parser.parse_args()
+
+    # Throughput depends on the machine, so no baseline is committed; each machine records its own
+    if not args.save and not args.baseline.exists():
+        parser.error(f"no baseline at {args.baseline}; record one on this machine with --save first")
+
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+    check_coverage()
+
+    sizes = [rows for rows in args.sizes if args.max_rows is None or rows <= args.max_rows]
+    results = run(sizes, args.only or list(CASES))
+
+    if args.save:
+        # Keep baseline entries for cases not run this time
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    unrecorded = sorted(set(results) - set(baseline))
+    if unrecorded:
+        print(f"Not in the baseline, so not compared: {', '.join(unrecorded)}")
+
+    regressions = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
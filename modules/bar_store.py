@@ -0,0 +1,137 @@
+import os
+import time
+import logging
+from datetime import timedelta
+from pathlib import Path
+import pandas as pd
+
+# One parquet file per symbol/interval under data/bars
+BAR_STORE_DIR = Path("data/bars")
+
+# Incremental updates go to a small tail file that is folded into the base file once it grows past this
+TAIL_MAX_ROWS = 500
+
+# Bars written within this many seconds are served without touching the network
+BAR_STORE_MAX_AGE = 300
+
+# First stored bar may fall this far after the requested start (weekends, holidays)
+COVERAGE_SLACK = timedelta(days=5)
+
+def bar_path(symbol, interval):
+    """Return the on-disk location of the bars for a symbol/interval"""
+    safe_symbol = str(symbol).replace('/', '_')
+    return BAR_STORE_DIR / interval / f"{safe_symbol}.parquet"
+
+def tail_path(symbol, interval):
+    """Return the location of the incremental tail file for a symbol/interval"""
+    return bar_path(symbol, interval).with_suffix('.tail.parquet')
+
+def _read_parquet(path, symbol, interval):
+    if not path.exists():
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+        return df if not df.empty else None
+    except Exception as e:
+        logging.warning(f"Failed to read stored bars for {symbol} ({interval}): {str(e)}")
+        return None
+
+def _write_parquet(path, df, symbol, interval):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+
+    try:
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logging.warning(f"Failed to store bars for {symbol} ({interval}): {str(e)}")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        return False
+
+def load_bars(symbol, interval):
+    """Load stored bars for a symbol/interval, or None if nothing usable is stored"""
+    base = _read_parquet(bar_path(symbol, interval), symbol, interval)
+    tail = _read_parquet(tail_path(symbol, interval), symbol, interval)
+    merged = merge_bars(base, tail)
+    return merged if merged is not None and not merged.empty else None
+
+def save_bars(symbol, interval, df):
+    """Write bars for a symbol/interval, replacing the stored files atomically"""
+    if df is None or df.empty:
+        return False
+
+    if not _write_parquet(bar_path(symbol, interval), df, symbol, interval):
+        return False
+
+    # The full write already contains everything the tail held
+    tail = tail_path(symbol, interval)
+    if tail.exists():
+        tail.unlink()
+    return True
+
+def append_bars(symbol, interval, df):
+    """Merge new bars into the tail file only, compacting into the base file when the tail gets large"""
+    if df is None or df.empty:
+        touch_bars(symbol, interval)
+        return True
+
+    tail = merge_bars(_read_parquet(tail_path(symbol, interval), symbol, interval), df)
+    if len(tail) > TAIL_MAX_ROWS:
+        base = _read_parquet(bar_path(symbol, interval), symbol, interval)
+        return save_bars(symbol, interval, merge_bars(base, tail))
+
+    return _write_parquet(tail_path(symbol, interval), tail, symbol, interval)
+
+def touch_bars(symbol, interval):
+    """Mark stored bars as checked just now without rewriting them"""
+    path = bar_path(symbol, interval)
+    if path.exists():
+        os.utime(path)
+
+def bars_age(symbol, interval):
+    """Seconds since the bars for a symbol/interval were last written or checked, or None"""
+    mtimes = [p.stat().st_mtime for p in (bar_path(symbol, interval), tail_path(symbol, interval)) if p.exists()]
+    if not mtimes:
+        return None
+    return time.time() - max(mtimes)
+
+def is_fresh(symbol, interval, max_age=BAR_STORE_MAX_AGE):
+    """Check whether the stored bars are recent enough to serve directly"""
+    age = bars_age(symbol, interval)
+    return age is not None and age <= max_age
+
+def align_timestamp(ts, index):
+    """Convert a datetime to a Timestamp comparable with the given index"""
+    ts = pd.Timestamp(ts)
+    tz = getattr(index, 'tz', None)
+    if tz is not None and ts.tzinfo is None:
+        return ts.tz_localize(tz)
+    if tz is None and ts.tzinfo is not None:
+        return ts.tz_localize(None)
+    return ts
+
+def covers_start(df, start_date):
+    """Check whether stored bars reach back far enough for the requested start"""
+    if df is None or df.empty:
+        return False
+    start = align_timestamp(start_date, df.index)
+    return df.index[0] <= start + COVERAGE_SLACK
+
+def slice_from(df, start_date):
+    """Return the bars at or after start_date"""
+    start = align_timestamp(start_date, df.index)
+    return df.loc[df.index >= start]
+
+def merge_bars(stored, fresh):
+    """Merge freshly fetched bars over stored ones, keeping the newest copy of each bar"""
+    if stored is None or stored.empty:
+        return fresh
+    if fresh is None or fresh.empty:
+        return stored
+
+    merged = pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep='last')]
+    return merged.sort_index()
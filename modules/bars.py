@@ -0,0 +1,53 @@
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+# float32 keeps ~7 significant digits, plenty for equity prices, at half the memory of float64
+PRICE_DTYPE = np.float32
+VOLUME_DTYPE = np.int32
+
+BarArrays = namedtuple('BarArrays', ['index', 'open', 'high', 'low', 'close', 'volume'])
+
+def compact_bars(df):
+    """Reduce a bar frame to OHLCV with float32 prices and int32 volume"""
+    if df is None or df.empty or not all(col in df.columns for col in OHLCV_COLUMNS):
+        return df
+
+    # Building all prices from one 2-D array keeps them in a single contiguous block
+    prices = np.ascontiguousarray(df[PRICE_COLUMNS].to_numpy(dtype=PRICE_DTYPE))
+    compact = pd.DataFrame(prices, index=df.index, columns=PRICE_COLUMNS)
+
+    volume = df['Volume'].fillna(0).to_numpy()
+    # Very heavy trading days can exceed int32, in which case keep the wider type
+    if volume.size and volume.max() > np.iinfo(VOLUME_DTYPE).max:
+        compact['Volume'] = volume.astype(np.int64)
+    else:
+        compact['Volume'] = volume.astype(VOLUME_DTYPE)
+    return compact
+
+def bar_arrays(df):
+    """Return the bars as contiguous typed NumPy arrays (plus their index) for the indicator kernels"""
+    return BarArrays(
+        index=df.index,
+        open=np.ascontiguousarray(df['Open'].to_numpy(dtype=PRICE_DTYPE)),
+        high=np.ascontiguousarray(df['High'].to_numpy(dtype=PRICE_DTYPE)),
+        low=np.ascontiguousarray(df['Low'].to_numpy(dtype=PRICE_DTYPE)),
+        close=np.ascontiguousarray(df['Close'].to_numpy(dtype=PRICE_DTYPE)),
+        volume=np.ascontiguousarray(df['Volume'].to_numpy()),
+    )
+
+def aggregate_bars(df, starts):
+    """Merge the runs of bars beginning at each position in `starts` (first open, max high, min low, last close, summed volume)"""
+    ends = np.append(starts[1:], len(df))
+    merged = pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends - 1],
+    }, index=df.index[starts])
+    if 'Volume' in df.columns:
+        merged['Volume'] = np.add.reduceat(df['Volume'].to_numpy(dtype=np.int64), starts)
+    return merged
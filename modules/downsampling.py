@@ -0,0 +1,60 @@
+import numpy as np
+from modules.bars import aggregate_bars
+
+# Plot width assumed when the caller does not know it; Streamlit's wide layout is about this wide
+DEFAULT_CHART_WIDTH = 1200
+
+# Horizontal pixels each drawn point needs; a candle needs a body and some spacing, a line vertex one pixel
+CANDLE_PIXELS = 3
+LINE_PIXELS = 1
+
+def max_points(chart_width, pixels_per_point):
+    """Most points worth sending for a trace drawn across `chart_width` pixels"""
+    return max(int(chart_width // pixels_per_point), 3)
+
+def lttb_indices(y, threshold):
+    """Positions kept by Largest-Triangle-Three-Buckets, which preserves the visual shape of a line"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick and the next bucket's mean
+        area = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+def downsample_line(series, threshold):
+    """LTTB-downsample a series to at most `threshold` points, skipping its NaN stretches"""
+    series = series.dropna()
+    if len(series) <= threshold:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(), threshold)]
+
+def downsample_ohlc(df, max_bars):
+    """Merge runs of consecutive bars into at most `max_bars` candles (first open, max high, min low, last close)"""
+    n = len(df)
+    if n <= max_bars:
+        return df
+
+    size = -(-n // max_bars)
+    return aggregate_bars(df, np.arange(0, n, size))
@@ -0,0 +1,56 @@
+import logging
+import threading
+
+# Entry checks in the order they run; each later stage costs more I/O than the one before.
+# With an ML model attached, 'ml' also fetches the options chain of symbols that skipped 'options'.
+ENTRY_STAGES = ['technical', 'analyst', 'options', 'ml']
+
+class PipelineStats:
+    """How many symbols reached and survived each entry stage"""
+
+    def __init__(self, stages=ENTRY_STAGES):
+        self.stages = list(stages)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.evaluated = {stage: 0 for stage in self.stages}
+            self.passed = {stage: 0 for stage in self.stages}
+
+    def record(self, stage, passed):
+        """Count one evaluation of a stage and return whether it passed"""
+        passed = bool(passed)
+        with self.lock:
+            self.evaluated[stage] += 1
+            self.passed[stage] += passed
+        return passed
+
+    def record_many(self, stage, evaluated, passed):
+        """Count a batch of evaluations of a stage, e.g. from the vectorized screener"""
+        with self.lock:
+            self.evaluated[stage] += evaluated
+            self.passed[stage] += passed
+
+    def summary(self):
+        """Per-stage evaluated and passed counts with the pass rate in percent"""
+        with self.lock:
+            return {
+                stage: {
+                    'evaluated': self.evaluated[stage],
+                    'passed': self.passed[stage],
+                    'pass_rate': (self.passed[stage] / self.evaluated[stage] * 100) if self.evaluated[stage] else None,
+                }
+                for stage in self.stages
+            }
+
+    def log_summary(self):
+        for stage, counts in self.summary().items():
+            if counts['evaluated']:
+                logging.info(f"Entry stage {stage}: {counts['passed']}/{counts['evaluated']} passed "
+                             f"({counts['pass_rate']:.0f}%)")
+            else:
+                logging.info(f"Entry stage {stage}: not reached")
+
+# Shared by every strategy; PortfolioManager resets it at the start of each scan
+entry_pipeline_stats = PipelineStats()
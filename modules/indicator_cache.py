@@ -0,0 +1,161 @@
+import os
+import hashlib
+import logging
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Indicator series keyed by what they were computed from, one parquet file each
+INDICATOR_CACHE_DIR = Path("data/indicators")
+
+# Least recently used results are evicted once the cache grows past this; 0 disables the cache
+INDICATOR_CACHE_MAX_BYTES = int(float(os.environ.get('INDICATOR_CACHE_MAX_MB', 256)) * 1024 * 1024)
+
+# Only a few weeks of bars are recomputed faster than a parquet file can be read back;
+# from this length on, which includes the default year of daily bars (~250 rows), results are cached
+INDICATOR_CACHE_MIN_ROWS = 100
+
+# Bump when an indicator's implementation changes so results computed by older code are not reused
+INDICATOR_CACHE_VERSION = 2
+
+# Keys also cover the source of the modules results are computed by, so a change to a formula,
+# kernel or graph node invalidates older results even if the version above was not bumped
+FORMULA_MODULES = ('indicators.py', 'window_kernels.py', 'indicator_graph.py')
+
+def _formula_fingerprint():
+    digest = hashlib.sha256()
+    for name in FORMULA_MODULES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+FORMULA_FINGERPRINT = _formula_fingerprint()
+
+def bars_digest(df, columns=('High', 'Low', 'Close')):
+    """Content hash of a bar slice: its timestamps and the price columns indicators read"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    digest.update(str(df.index.dtype).encode())
+    for column in columns:
+        values = np.ascontiguousarray(df[column].to_numpy())
+        digest.update(column.encode())
+        digest.update(str(values.dtype).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+def last_bar_complete(df, now=None):
+    """Whether the last bar has closed, judging the bar length from the spacing of the latest bars
+
+    Results over a bar that is still in progress are not worth persisting: the bar changes on
+    every fetch, so they would never be looked up again.
+    """
+    if len(df) < 2:
+        return False
+    latest = df.index[-6:]
+    step = (latest[1:] - latest[:-1]).min()
+    if now is None:
+        now = pd.Timestamp.now(tz=df.index.tz)
+    return df.index[-1] + step <= now
+
+def result_key(digest, name, params=()):
+    """Cache key for an indicator computed over the bars with the given digest"""
+    text = f"{INDICATOR_CACHE_VERSION}|{FORMULA_FINGERPRINT}|{digest}|{name}|{params!r}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+class IndicatorResultCache:
+    """On-disk, content-addressed indicator results with least-recently-used eviction by total size"""
+
+    def __init__(self, root=INDICATOR_CACHE_DIR, max_bytes=INDICATOR_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None  # Measured on first write, then kept up to date
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def path(self, key):
+        # Two-character fan-out keeps directories small
+        return self.root / key[:2] / f"{key}.parquet"
+
+    def get(self, key):
+        """Return the cached series for a key, or None"""
+        if not self.enabled:
+            return None
+        path = self.path(key)
+        if not path.exists():
+            return None
+
+        try:
+            series = pd.read_parquet(path)['value']
+            # Reads count as use for eviction
+            os.utime(path)
+            return series
+        except Exception as e:
+            logging.warning(f"Failed to read cached indicator {key}: {str(e)}")
+            return None
+
+    def put(self, key, series):
+        """Store a series under a key, then evict old entries if the cache is over its size budget"""
+        if not self.enabled:
+            return
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Other processes may share the cache directory, so the pid keeps their temp files apart too
+        tmp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+
+        try:
+            series.rename('value').to_frame().to_parquet(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logging.warning(f"Failed to cache indicator {key}: {str(e)}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+            return
+
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes += path.stat().st_size
+        if self.total_bytes is None or self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used results until the cache fits in max_bytes"""
+        with self.lock:
+            entries = []
+            total = 0
+            for path in self.root.glob('*/*.parquet'):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            self.total_bytes = total
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self.total_bytes = total
+            logging.info(f"Evicted {removed} cached indicator results")
+
+    def clear(self):
+        with self.lock:
+            for path in self.root.glob('*/*.parquet'):
+                path.unlink()
+            self.total_bytes = 0
+
+# Shared by every process working in the same data directory
+indicator_cache = IndicatorResultCache()
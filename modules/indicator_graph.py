@@ -0,0 +1,179 @@
+import threading
+import pandas as pd
+from modules.indicator_cache import indicator_cache, bars_digest, last_bar_complete, result_key, INDICATOR_CACHE_MIN_ROWS
+from modules.indicators import (
+    ema, macd_from_emas, calculate_sma, moving_std, bollinger_edges, calculate_atr, calculate_rsi,
+    support_level, resistance_level
+)
+
+def data_version(df):
+    """Cheap fingerprint of a bar frame; changes whenever a bar is added or the latest bar moves"""
+    if df is None or df.empty:
+        return None
+    last = df.iloc[-1]
+    return (len(df), df.index[0], df.index[-1], float(last['High']), float(last['Low']), float(last['Close']))
+
+class _Memo:
+    """Node values for one data version of a symbol, plus the content hash used as the disk cache key"""
+
+    def __init__(self, version):
+        self.version = version
+        self.values = {}
+        self.digest = None
+
+class IndicatorGraph:
+    """Indicator nodes computed once per (symbol, data version) and shared by every consumer"""
+
+    def __init__(self, result_cache=indicator_cache):
+        self.nodes = {}
+        self.lock = threading.Lock()
+        self.memo = {}  # symbol -> _Memo for the latest data version
+        self.result_cache = result_cache
+
+    def node(self, name, deps=(), persist=True):
+        """Register a node computed from the bar frame and the values of its dependencies
+
+        Nodes that are just a column or a one-line transform of one are not worth persisting.
+        """
+        def register(fn):
+            self.nodes[name] = (tuple(deps), fn, persist)
+            return fn
+        return register
+
+    def _memo_for(self, symbol, version):
+        with self.lock:
+            memo = self.memo.get(symbol)
+            # Only the latest version per symbol is kept; older ones can never be asked for again
+            if memo is None or memo.version != version:
+                memo = _Memo(version)
+                self.memo[symbol] = memo
+            return memo
+
+    def _persisted(self, name, df, memo):
+        """Cache key for a node's result on disk, or None when the result should not be persisted"""
+        if self.result_cache is None or not self.result_cache.enabled or len(df) < INDICATOR_CACHE_MIN_ROWS:
+            return None
+        # While the last bar is in progress each fetch hashes differently; keep those results in memory only
+        if not last_bar_complete(df):
+            return None
+        if memo.digest is None:
+            memo.digest = bars_digest(df)
+        return result_key(memo.digest, name)
+
+    def _evaluate(self, name, df, memo):
+        values = memo.values
+        if name in values:
+            return values[name]
+        if name not in self.nodes:
+            raise KeyError(f"Unknown indicator node: {name}")
+
+        deps, fn, persist = self.nodes[name]
+        key = self._persisted(name, df, memo) if persist else None
+        result = self.result_cache.get(key) if key is not None else None
+        if result is None:
+            result = fn(df, *(self._evaluate(dep, df, memo) for dep in deps))
+            if key is not None:
+                self.result_cache.put(key, result)
+        values[name] = result
+        return result
+
+    def get(self, symbol, df, name):
+        """Value of one node for a symbol's bars, computing it and its dependencies only if needed"""
+        return self._evaluate(name, df, self._memo_for(symbol, data_version(df)))
+
+    def frame(self, symbol, df, names):
+        """Several series nodes as columns of one frame"""
+        memo = self._memo_for(symbol, data_version(df))
+        return pd.DataFrame({name: self._evaluate(name, df, memo) for name in names}, index=df.index)
+
+    def computed(self, symbol):
+        """Names of the nodes currently memoized for a symbol"""
+        with self.lock:
+            memo = self.memo.get(symbol)
+            return sorted(memo.values) if memo else []
+
+    def clear(self):
+        with self.lock:
+            self.memo.clear()
+
+# Shared by the dashboard and the trading strategies
+indicator_graph = IndicatorGraph()
+
+# Nodes only wire the shared formulas in modules.indicators together, so intermediate
+# results such as the EMAs and the 20-bar SMA are computed once and reused
+
+@indicator_graph.node('close', persist=False)
+def _close(df):
+    return df['Close']
+
+@indicator_graph.node('high', persist=False)
+def _high(df):
+    return df['High']
+
+@indicator_graph.node('low', persist=False)
+def _low(df):
+    return df['Low']
+
+@indicator_graph.node('ema_12', deps=['close'])
+def _ema_12(df, close):
+    return ema(close, 12)
+
+@indicator_graph.node('ema_26', deps=['close'])
+def _ema_26(df, close):
+    return ema(close, 26)
+
+@indicator_graph.node('macd_lines', deps=['ema_12', 'ema_26'], persist=False)
+def _macd_lines(df, ema_12, ema_26):
+    return macd_from_emas(ema_12, ema_26, 9)
+
+@indicator_graph.node('macd', deps=['macd_lines'])
+def _macd(df, macd_lines):
+    return macd_lines[0]
+
+@indicator_graph.node('macd_signal', deps=['macd_lines'])
+def _macd_signal(df, macd_lines):
+    return macd_lines[1]
+
+@indicator_graph.node('macd_hist', deps=['macd_lines'])
+def _macd_hist(df, macd_lines):
+    return macd_lines[2]
+
+@indicator_graph.node('sma_20', deps=['close'])
+def _sma_20(df, close):
+    return calculate_sma(close, 20)
+
+@indicator_graph.node('sma_50', deps=['close'])
+def _sma_50(df, close):
+    return calculate_sma(close, 50)
+
+@indicator_graph.node('std_20', deps=['close'])
+def _std_20(df, close):
+    return moving_std(close, 20)
+
+@indicator_graph.node('bollinger_bands', deps=['sma_20', 'std_20'], persist=False)
+def _bollinger_bands(df, sma_20, std_20):
+    return bollinger_edges(sma_20, std_20, 2)
+
+@indicator_graph.node('bollinger_upper', deps=['bollinger_bands'])
+def _bollinger_upper(df, bollinger_bands):
+    return bollinger_bands[0]
+
+@indicator_graph.node('bollinger_lower', deps=['bollinger_bands'])
+def _bollinger_lower(df, bollinger_bands):
+    return bollinger_bands[1]
+
+@indicator_graph.node('atr_14')
+def _atr_14(df):
+    return calculate_atr(df, 14)
+
+@indicator_graph.node('rsi_14', deps=['close'])
+def _rsi_14(df, close):
+    return calculate_rsi(close, 14)
+
+@indicator_graph.node('support_20', deps=['low'])
+def _support_20(df, low):
+    return support_level(low, 20)
+
+@indicator_graph.node('resistance_20', deps=['high'])
+def _resistance_20(df, high):
+    return resistance_level(high, 20)
@@ -0,0 +1,158 @@
+from collections import namedtuple
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from modules.bars import bar_arrays
+from modules.latest_indicators import (
+    EMA_WARMUP, latest_mean, latest_std, latest_extreme, latest_rsi, latest_atr, latest_macd
+)
+
+# Bars per symbol kept in the panel; enough history for the slowest EMA to settle
+PANEL_DEPTH = EMA_WARMUP
+
+IndicatorPanel = namedtuple('IndicatorPanel', ['symbols', 'indexes', 'high', 'low', 'close'])
+
+def build_panel(frames, depth=PANEL_DEPTH):
+    """Stack every symbol's most recent bars into time x symbol arrays"""
+    # Rows are aligned on position from the latest bar, which is time alignment for symbols
+    # trading the same sessions; shorter histories are padded with leading NaNs
+    symbols = [symbol for symbol, df in frames.items() if df is not None and not df.empty]
+    rows = min(depth, max((len(frames[symbol]) for symbol in symbols), default=0))
+
+    high = np.full((rows, len(symbols)), np.nan)
+    low = np.full((rows, len(symbols)), np.nan)
+    close = np.full((rows, len(symbols)), np.nan)
+    indexes = []
+
+    for column, symbol in enumerate(symbols):
+        bars = bar_arrays(frames[symbol].iloc[-rows:])
+        count = len(bars.close)
+        high[rows - count:, column] = bars.high
+        low[rows - count:, column] = bars.low
+        close[rows - count:, column] = bars.close
+        indexes.append(bars.index)
+
+    return IndicatorPanel(symbols, indexes, high, low, close)
+
+# EMA state of one symbol's MACD at a complete bar: the bar's timestamp and close, and the
+# fast EMA, slow EMA and signal line after it
+MACDState = namedtuple('MACDState', ['timestamp', 'close', 'fast', 'slow', 'signal'])
+
+class MACDStateCache:
+    """MACD EMA state per symbol, carried from one panel scan to the next"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def get(self, symbol):
+        with self.lock:
+            return self.states.get(symbol)
+
+    def put(self, symbol, state):
+        with self.lock:
+            self.states[symbol] = state
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
+
+# Shared by every scan of the portfolio manager
+macd_states = MACDStateCache()
+
+def _resume_row(panel, column, state):
+    """Panel row holding the bar a carried state was taken at, or None if the state no longer applies"""
+    if state is None:
+        return None
+    index = panel.indexes[column]
+    if state.timestamp not in index:
+        return None
+    row = panel.close.shape[0] - len(index) + index.get_loc(state.timestamp)
+    # The last bar is still in progress, so a state is only ever taken at an earlier bar;
+    # a moved close means the history was rewritten (e.g. split-adjusted)
+    if row >= panel.close.shape[0] - 1 or panel.close[row, column] != state.close:
+        return None
+    return row
+
+def _latest_macd(panel, states):
+    """Latest MACD for every column, stepping only the bars since each symbol's carried state
+
+    Symbols without a usable state are warmed up over the panel. Either way the EMAs are first
+    brought up to the last complete bar, whose state is kept for the next scan, and then
+    stepped over the in-progress bar.
+    """
+    close = panel.close
+    columns = len(panel.symbols)
+    fast = np.full(columns, np.nan)
+    slow = np.full(columns, np.nan)
+    signal = np.full(columns, np.nan)
+
+    saved = [states.get(symbol) if states is not None else None for symbol in panel.symbols]
+    rows = [_resume_row(panel, column, saved[column]) for column in range(columns)]
+    fresh = [column for column in range(columns) if rows[column] is None]
+
+    if fresh:
+        _, state = latest_macd(close[:-1, fresh], 12, 26, 9)
+        if state is not None:
+            fast[fresh], slow[fresh], signal[fresh] = state
+
+    # Carried columns are grouped by the row their state was taken at, so every column steps
+    # over exactly the bars since its own state; a scan usually leaves one or two groups
+    groups = {}
+    for column in range(columns):
+        if rows[column] is not None:
+            groups.setdefault(rows[column], []).append(column)
+    for row, group in groups.items():
+        state = (np.array([saved[column].fast for column in group]),
+                 np.array([saved[column].slow for column in group]),
+                 np.array([saved[column].signal for column in group]))
+        _, state = latest_macd(close[row + 1:-1, group], 12, 26, 9, state=state)
+        fast[group], slow[group], signal[group] = state
+
+    if states is not None and close.shape[0] > 1:
+        for column, symbol in enumerate(panel.symbols):
+            states.put(symbol, MACDState(panel.indexes[column][-2] if len(panel.indexes[column]) > 1 else None,
+                                         close[-2, column], fast[column], slow[column], signal[column]))
+
+    # Step every column over the in-progress bar
+    (macd_line, signal_line, macd_hist), _ = latest_macd(close[-1:], 12, 26, 9, state=(fast, slow, signal))
+    return macd_line, signal_line, macd_hist
+
+def compute_latest_indicators(panel, states=None):
+    """Latest RSI, SMA, MACD, Bollinger, ATR and support/resistance for every symbol in one pass
+
+    With `states`, the MACD EMAs continue from the previous scan instead of warming up again.
+    """
+    close, high, low = panel.close, panel.high, panel.low
+    if not panel.symbols:
+        return pd.DataFrame()
+
+    macd_line, signal_line, macd_hist = _latest_macd(panel, states)
+
+    mid = latest_mean(close, 20)
+    std = latest_std(close, 20)
+
+    table = pd.DataFrame({
+        'timestamp': [index[-1] for index in panel.indexes],
+        'price': close[-1],
+        'rsi': latest_rsi(close, 14),
+        'sma_20': mid,
+        'sma_50': latest_mean(close, 50),
+        'macd': macd_line,
+        'macd_signal': signal_line,
+        'macd_hist': macd_hist,
+        'bollinger_mid': mid,
+        'bollinger_upper': mid + 2 * std,
+        'bollinger_lower': mid - 2 * std,
+        'atr': latest_atr(high, low, close, 14),
+        'support': latest_extreme(low, 20, np.min),
+        'resistance': latest_extreme(high, 20, np.max),
+    }, index=pd.Index(panel.symbols, name='symbol'))
+
+    logging.info(f"Computed indicator panel for {len(panel.symbols)} symbols over {close.shape[0]} bars")
+    return table
+
+def latest_indicator_table(frames, depth=PANEL_DEPTH, states=macd_states):
+    """Build the panel for a dict of per-symbol bars and return the table of latest indicator values"""
+    return compute_latest_indicators(build_panel(frames, depth), states)
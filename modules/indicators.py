@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from modules.window_kernels import rolling_mean, rolling_std, rolling_max, rolling_min, rolling_mean_many, rolling_std_many
+
+# Indicator formulas on pandas Series and bar frames. technical_analysis re-exports the
+# calculate_* functions, and the indicator graph builds its nodes from the same pieces,
+# so every formula is written once.
+
+def _series(like, values):
+    return pd.Series(values, index=like.index)
+
+def ema(data, span):
+    """Exponential moving average as used throughout the strategy (pandas ewm, adjust=False)"""
+    return data.ewm(span=span, adjust=False).mean()
+
+def macd_from_emas(fast_ema, slow_ema, signal=9):
+    """MACD line, signal line and histogram from an already computed fast and slow EMA"""
+    macd_line = fast_ema - slow_ema
+    signal_line = ema(macd_line, signal)
+    macd_hist = macd_line - signal_line
+    return macd_line, signal_line, macd_hist
+
+def calculate_macd(data, fast=12, slow=26, signal=9):
+    """Calculate MACD (Moving Average Convergence/Divergence) and its signal line."""
+    return macd_from_emas(ema(data, fast), ema(data, slow), signal)
+
+def moving_std(data, window):
+    """Rolling sample standard deviation"""
+    return _series(data, rolling_std(data.to_numpy(), window))
+
+def bollinger_edges(mid, std, num_std=2):
+    """Upper and lower Bollinger band around a moving average"""
+    return mid + num_std * std, mid - num_std * std
+
+def calculate_bollinger_bands(data, window=20, num_std=2):
+    """Calculate Bollinger Bands (upper and lower bands) for the given window."""
+    mid = calculate_sma(data, window)
+    upper_band, lower_band = bollinger_edges(mid, moving_std(data, window), num_std)
+    return mid, upper_band, lower_band
+
+def true_range(df):
+    """Largest of high - low and the gaps from the previous close to the high and the low"""
+    high_low = df['High'] - df['Low']
+    high_close = (df['High'] - df['Close'].shift(1)).abs()
+    low_close = (df['Low'] - df['Close'].shift(1)).abs()
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+
+def calculate_atr(df, period=14):
+    """Calculate Average True Range for volatility measurement."""
+    return calculate_sma(true_range(df), period)
+
+def calculate_sma(data, window):
+    """Calculate Simple Moving Average"""
+    return _series(data, rolling_mean(data.to_numpy(), window))
+
+def calculate_rsi(data, periods=14):
+    """Calculate Relative Strength Index"""
+    delta = data.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def support_level(lows, window=20):
+    """Lowest low of the trailing window"""
+    return _series(lows, rolling_min(lows.to_numpy(), window))
+
+def resistance_level(highs, window=20):
+    """Highest high of the trailing window"""
+    return _series(highs, rolling_max(highs.to_numpy(), window))
+
+def calculate_support_resistance(df, window=20):
+    """Calculate support and resistance levels"""
+    return support_level(df['Low'], window), resistance_level(df['High'], window)
+
+def calculate_sma_sweep(data, windows):
+    """Calculate Simple Moving Averages for many windows at once, one column per window"""
+    return pd.DataFrame(rolling_mean_many(data.to_numpy(), windows), index=data.index, columns=list(windows))
+
+def calculate_rsi_sweep(data, periods):
+    """Calculate RSI for many lookback periods at once, one column per period"""
+    delta = data.diff().to_numpy(dtype=np.float64)
+    # NaN changes count as zero, exactly as in calculate_rsi
+    gain = rolling_mean_many(np.where(delta > 0, delta, 0.0), periods, centre=False)
+    loss = rolling_mean_many(np.where(delta < 0, -delta, 0.0), periods, centre=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+    return pd.DataFrame(rsi, index=data.index, columns=list(periods))
+
+def calculate_bollinger_sweep(data, windows, num_stds=(2,)):
+    """Calculate Bollinger Bands for every (window, num_std) pair, columns indexed by both"""
+    mid = rolling_mean_many(data.to_numpy(), windows)
+    std = rolling_std_many(data.to_numpy(), windows)
+    widths = np.asarray(num_stds, dtype=np.float64)
+
+    columns = pd.MultiIndex.from_product([list(windows), list(num_stds)], names=['window', 'num_std'])
+    rows = len(data)
+    # Broadcast each window's mean and std against every band width
+    upper = (mid[:, :, None] + std[:, :, None] * widths).reshape(rows, -1)
+    lower = (mid[:, :, None] - std[:, :, None] * widths).reshape(rows, -1)
+    mid = np.repeat(mid, len(widths), axis=1)
+    return (
+        pd.DataFrame(mid, index=data.index, columns=columns),
+        pd.DataFrame(upper, index=data.index, columns=columns),
+        pd.DataFrame(lower, index=data.index, columns=columns),
+    )
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Bars an EMA is warmed up over when it has no carried state; (1 - 2/27) ** 260 leaves
+# the slowest (26-bar) EMA within ~1e-9 of its full-history value
+EMA_WARMUP = 260
+
+def _missing(values):
+    return np.full(values.shape[1:], np.nan) if values.ndim > 1 else np.nan
+
+def latest_mean(values, window):
+    """Mean of the last `window` rows (per column for 2-D input), NaN if any of them is missing"""
+    if values.shape[0] < window:
+        return _missing(values)
+    return values[-window:].mean(axis=0)
+
+def latest_std(values, window):
+    """Sample standard deviation of the last `window` rows"""
+    if values.shape[0] < window:
+        return _missing(values)
+    return values[-window:].std(axis=0, ddof=1)
+
+def latest_extreme(values, window, reducer):
+    """np.max or np.min of the last `window` rows"""
+    if values.shape[0] < window:
+        return _missing(values)
+    return reducer(values[-window:], axis=0)
+
+def latest_rsi(close, periods=14):
+    """RSI over simple averages of the last `periods` price changes, matching calculate_rsi"""
+    # Needs periods + 1 closes for `periods` price changes
+    if close.shape[0] < periods + 1:
+        return _missing(close)
+    delta = np.diff(close[-(periods + 1):], axis=0)
+    gain = np.where(delta > 0, delta, 0.0).mean(axis=0)
+    loss = np.where(delta < 0, -delta, 0.0).mean(axis=0)
+    gain = np.where(np.isnan(delta).any(axis=0), np.nan, gain)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
+def latest_atr(high, low, close, period=14):
+    """Average true range over the last `period` bars, matching calculate_atr"""
+    if close.shape[0] < period + 1:
+        return _missing(close)
+    h = high[-period:]
+    l = low[-period:]
+    prev_close = close[-(period + 1):-1]
+    true_range = np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+    # The very first bar of a symbol has no previous close; its true range is just high - low
+    true_range = np.where(np.isnan(prev_close), h - l, true_range)
+    return true_range.mean(axis=0)
+
+def ema_path(values, span, state=None):
+    """EMA down axis 0 (pandas ewm adjust=False), continuing from `state` if given"""
+    alpha = 2.0 / (span + 1)
+    out = np.empty(values.shape)
+    ema = np.full(values.shape[1:], np.nan) if state is None else np.asarray(state, dtype=np.float64)
+    for row in range(values.shape[0]):
+        x = values[row]
+        stepped = alpha * x + (1 - alpha) * ema
+        # Start at the first bar and carry the EMA through missing bars
+        ema = np.where(np.isnan(ema), x, np.where(np.isnan(x), ema, stepped))
+        out[row] = ema
+    return out
+
+def latest_macd(close, fast=12, slow=26, signal=9, state=None):
+    """Latest MACD line, signal and histogram, plus the EMA state to carry into the next call
+
+    Without a state the EMAs are warmed up over the last EMA_WARMUP bars; with one, `close`
+    should hold only the bars since that state was taken.
+    """
+    if state is None:
+        close = close[-EMA_WARMUP:]
+        state = (None, None, None)
+    fast_ema, slow_ema, signal_line = state
+
+    if close.shape[0]:
+        fast_path = ema_path(close, fast, fast_ema)
+        slow_path = ema_path(close, slow, slow_ema)
+        signal_path = ema_path(fast_path - slow_path, signal, signal_line)
+        fast_ema, slow_ema, signal_line = fast_path[-1], slow_path[-1], signal_path[-1]
+
+    if fast_ema is None:
+        return (_missing(close),) * 3, None
+    macd_line = fast_ema - slow_ema
+    return (macd_line, signal_line, macd_line - signal_line), (fast_ema, slow_ema, signal_line)
@@ -0,0 +1,321 @@
+import os
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from modules.rate_limiter import market_data_limiter, MARKET_DATA_BATCH_COST
+from modules.bar_store import align_timestamp, merge_bars
+
+# Which provider get_provider() builds by default: 'yfinance', 'replay' or 'record'
+MARKET_DATA_PROVIDER = os.environ.get('MARKET_DATA_PROVIDER', 'yfinance')
+
+# Directory recorded market data is written to and replayed from
+MARKET_DATA_REPLAY_DIR = Path(os.environ.get('MARKET_DATA_REPLAY_DIR', 'data/replay'))
+
+class MarketDataProvider(ABC):
+    """Source of bars, ticker info, option chains and news"""
+
+    # Whether fetched bars should be written through to the local bar store
+    cache_locally = True
+
+    def now(self):
+        """Current time as seen by this provider; history windows are measured back from it"""
+        return datetime.now()
+
+    @abstractmethod
+    def history(self, symbol, start, end, interval):
+        """Return OHLCV bars for one symbol between start and end"""
+
+    def download(self, symbols, start, end, interval):
+        """Return a dict of symbol -> OHLCV bars for many symbols"""
+        return {symbol: self.history(symbol, start, end, interval) for symbol in symbols}
+
+    @abstractmethod
+    def info(self, symbol):
+        """Return the ticker info dict"""
+
+    @abstractmethod
+    def calendar(self, symbol):
+        """Return the earnings calendar, or None"""
+
+    @abstractmethod
+    def news(self, symbol):
+        """Return a list of news item dicts"""
+
+    @abstractmethod
+    def option_expirations(self, symbol):
+        """Return the available option expiration dates"""
+
+    @abstractmethod
+    def option_chain(self, symbol, expiration):
+        """Return (calls, puts) frames for one expiration"""
+
+    @abstractmethod
+    def sp500_constituents(self):
+        """Return the S&P 500 constituents as a frame with Symbol and Security columns"""
+
+# Wikipedia keeps the constituent list Yahoo Finance does not offer
+SP500_CONSTITUENTS_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance, paced by the shared market-data limiter"""
+
+    def history(self, symbol, start, end, interval):
+        with market_data_limiter.request():
+            return yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+
+    def download(self, symbols, start, end, interval):
+        with market_data_limiter.request(tokens=MARKET_DATA_BATCH_COST):
+            data = yf.download(
+                symbols,
+                start=start,
+                end=end,
+                interval=interval,
+                group_by='ticker',
+                auto_adjust=True,  # Match Ticker.history defaults
+                ignore_tz=False,  # Keep the exchange timezone so bars merge with the store
+                threads=True,
+                progress=False
+            )
+
+        frames = {}
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                df = data[symbol]
+            elif len(symbols) == 1:
+                df = data
+            else:
+                continue
+            # Rows are aligned across the whole group, so drop the ones this symbol did not trade
+            frames[symbol] = df.dropna(how='all')
+        return frames
+
+    def info(self, symbol):
+        with market_data_limiter.request():
+            return yf.Ticker(symbol).info
+
+    def calendar(self, symbol):
+        with market_data_limiter.request():
+            return yf.Ticker(symbol).calendar
+
+    def news(self, symbol):
+        with market_data_limiter.request():
+            return yf.Ticker(symbol).news or []
+
+    def option_expirations(self, symbol):
+        with market_data_limiter.request():
+            return yf.Ticker(symbol).options
+
+    def option_chain(self, symbol, expiration):
+        with market_data_limiter.request():
+            chain = yf.Ticker(symbol).option_chain(expiration)
+        return chain.calls, chain.puts
+
+    def sp500_constituents(self):
+        tables = pd.read_html(SP500_CONSTITUENTS_URL)
+        if not tables:
+            raise ValueError("No tables found on the page")
+        return tables[0]
+
+def _safe_name(value):
+    return str(value).replace('/', '_')
+
+def _encode(value):
+    """JSON fallback for recorded objects; dates are tagged so a replay gets the same types back"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot record {type(value).__name__} values")
+
+def _decode(obj):
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__date__' in obj:
+        return date.fromisoformat(obj['__date__'])
+    return obj
+
+class ReplayProvider(MarketDataProvider):
+    """Serves market data recorded to disk by RecordingProvider, without touching the network"""
+
+    # Recorded files are already local; writing them to the bar store would mix replayed and live bars
+    cache_locally = False
+
+    def __init__(self, root=MARKET_DATA_REPLAY_DIR):
+        self.root = Path(root)
+        manifest = self.root / 'manifest.json'
+        self.as_of = None
+        if manifest.exists():
+            with open(manifest, 'r') as f:
+                self.as_of = datetime.fromisoformat(json.load(f)['as_of'])
+
+    def now(self):
+        # Measure windows from the recording time so replays do not drift with the wall clock
+        return self.as_of or datetime.now()
+
+    def _load_object(self, *parts, default=None):
+        path = self.root.joinpath(*parts)
+        if not path.exists():
+            return default
+        # Recordings are plain JSON, so loading a shared one cannot run code
+        with open(path, 'r') as f:
+            return json.load(f, object_hook=_decode)
+
+    def _load_frame(self, *parts):
+        path = self.root.joinpath(*parts)
+        if not path.exists():
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+    def history(self, symbol, start, end, interval):
+        df = self._load_frame('bars', interval, f"{_safe_name(symbol)}.parquet")
+        if df.empty:
+            return df
+        start = align_timestamp(start, df.index)
+        end = align_timestamp(end, df.index)
+        return df.loc[(df.index >= start) & (df.index < end)]
+
+    def info(self, symbol):
+        return self._load_object('info', f"{_safe_name(symbol)}.json", default={})
+
+    def calendar(self, symbol):
+        return self._load_object('calendar', f"{_safe_name(symbol)}.json")
+
+    def news(self, symbol):
+        return self._load_object('news', f"{_safe_name(symbol)}.json", default=[])
+
+    def option_expirations(self, symbol):
+        return tuple(self._load_object('options', _safe_name(symbol), 'expirations.json', default=()))
+
+    def option_chain(self, symbol, expiration):
+        calls = self._load_frame('options', _safe_name(symbol), f"{expiration}_calls.parquet")
+        puts = self._load_frame('options', _safe_name(symbol), f"{expiration}_puts.parquet")
+        return calls, puts
+
+    def sp500_constituents(self):
+        path = self.root / 'sp500.csv'
+        if not path.exists():
+            return pd.DataFrame(columns=['Symbol', 'Security'])
+        return pd.read_csv(path, dtype=str)
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps another provider and records everything it serves in the layout ReplayProvider reads"""
+
+    # Bars served from the local store would never reach the recording, so always fetch the full window
+    cache_locally = False
+
+    def __init__(self, inner, root=MARKET_DATA_REPLAY_DIR):
+        self.inner = inner
+        self.root = Path(root)
+        self.lock = threading.Lock()
+
+    def _path(self, *parts):
+        path = self.root.joinpath(*parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def _touch_manifest(self):
+        with self.lock:
+            with open(self._path('manifest.json'), 'w') as f:
+                json.dump({'as_of': datetime.now().isoformat()}, f, indent=4)
+
+    def _save_object(self, value, *parts):
+        try:
+            text = json.dumps(value, default=_encode, indent=4)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Failed to record {'/'.join(parts)}: {str(e)}")
+            return
+        with open(self._path(*parts), 'w') as f:
+            f.write(text)
+        self._touch_manifest()
+
+    def _save_frame(self, df, *parts):
+        try:
+            df.to_parquet(self._path(*parts))
+            self._touch_manifest()
+        except Exception as e:
+            logging.warning(f"Failed to record {'/'.join(parts)}: {str(e)}")
+
+    def _save_bars(self, symbol, interval, df):
+        if df is None or df.empty:
+            return
+        path = self._path('bars', interval, f"{_safe_name(symbol)}.parquet")
+        if path.exists():
+            # Keep the widest recording seen so far
+            df = merge_bars(pd.read_parquet(path), df)
+        self._save_frame(df, 'bars', interval, f"{_safe_name(symbol)}.parquet")
+
+    def history(self, symbol, start, end, interval):
+        df = self.inner.history(symbol, start, end, interval)
+        self._save_bars(symbol, interval, df)
+        return df
+
+    def download(self, symbols, start, end, interval):
+        frames = self.inner.download(symbols, start, end, interval)
+        for symbol, df in frames.items():
+            self._save_bars(symbol, interval, df)
+        return frames
+
+    def info(self, symbol):
+        info = self.inner.info(symbol)
+        self._save_object(info, 'info', f"{_safe_name(symbol)}.json")
+        return info
+
+    def calendar(self, symbol):
+        calendar = self.inner.calendar(symbol)
+        self._save_object(calendar, 'calendar', f"{_safe_name(symbol)}.json")
+        return calendar
+
+    def news(self, symbol):
+        news = self.inner.news(symbol)
+        self._save_object(news, 'news', f"{_safe_name(symbol)}.json")
+        return news
+
+    def option_expirations(self, symbol):
+        expirations = self.inner.option_expirations(symbol)
+        self._save_object(list(expirations), 'options', _safe_name(symbol), 'expirations.json')
+        return expirations
+
+    def option_chain(self, symbol, expiration):
+        calls, puts = self.inner.option_chain(symbol, expiration)
+        self._save_frame(calls, 'options', _safe_name(symbol), f"{expiration}_calls.parquet")
+        self._save_frame(puts, 'options', _safe_name(symbol), f"{expiration}_puts.parquet")
+        return calls, puts
+
+    def sp500_constituents(self):
+        df = self.inner.sp500_constituents()
+        try:
+            df.to_csv(self._path('sp500.csv'), index=False)
+            self._touch_manifest()
+        except Exception as e:
+            logging.warning(f"Failed to record sp500.csv: {str(e)}")
+        return df
+
+_provider = None
+
+def get_provider():
+    """Return the process-wide market-data provider, building it from MARKET_DATA_PROVIDER on first use"""
+    global _provider
+    if _provider is None:
+        if MARKET_DATA_PROVIDER == 'replay':
+            _provider = ReplayProvider()
+        elif MARKET_DATA_PROVIDER == 'record':
+            _provider = RecordingProvider(YFinanceProvider())
+        else:
+            _provider = YFinanceProvider()
+        logging.info(f"Using {type(_provider).__name__} for market data")
+    return _provider
+
+def set_provider(provider):
+    """Swap the process-wide market-data provider, e.g. for a ReplayProvider in offline profiling"""
+    global _provider
+    _provider = provider
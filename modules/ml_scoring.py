@@ -0,0 +1,78 @@
+import logging
+import numpy as np
+from modules.entry_pipeline import entry_pipeline_stats
+
+# Trades the model rates below this probability of success are skipped
+ML_MIN_PROBABILITY = 0.5
+
+def success_probabilities(ml_model, rows):
+    """Probability of a positive outcome for each feature row, scored in one predict_proba call"""
+    if not rows:
+        return np.empty(0)
+    return np.asarray(ml_model.predict_proba(np.asarray(rows, dtype=float)))[:, 1]
+
+def _feature_row(strategy):
+    """A strategy's ML features as a float row, raising if any of them is missing or not a number"""
+    row = np.asarray(strategy.ml_features(strategy.snapshot()), dtype=float)
+    if not np.isfinite(row).all():
+        raise ValueError(f"non-finite features {row.tolist()}")
+    return row
+
+def _score(ml_model, symbols, rows):
+    """Probabilities for each symbol's row, or NaN for a row the model rejects
+
+    All rows go through one predict_proba call; only if that call fails are they scored one
+    at a time, so a row the model cannot handle rules out its own symbol and nothing else.
+    """
+    try:
+        return success_probabilities(ml_model, rows)
+    except Exception as e:
+        logging.warning(f"Batched ML scoring failed ({str(e)}), scoring {len(rows)} candidates one by one")
+
+    probabilities = np.full(len(rows), np.nan)
+    for i, (symbol, row) in enumerate(zip(symbols, rows)):
+        try:
+            probabilities[i] = success_probabilities(ml_model, [row])[0]
+        except Exception as e:
+            logging.error(f"Error scoring {symbol} with the ML model: {str(e)}")
+    return probabilities
+
+def ml_approved(strategies, symbols):
+    """Symbols whose attached ML model rates the trade likely to succeed
+
+    Feature rows of all symbols sharing a model are stacked into one matrix, so the model is
+    called once per scan instead of once per candidate. Symbols without a model pass unscored;
+    a symbol whose features or score cannot be computed is ruled out on its own.
+    """
+    approved = set()
+    batches = {}
+    for symbol in symbols:
+        strategy = strategies[symbol]
+        ml_model = getattr(strategy, 'ml_model', None)
+        if ml_model is None:
+            approved.add(symbol)
+            continue
+        try:
+            row = _feature_row(strategy)
+        except Exception as e:
+            logging.error(f"Error building ML features for {symbol}: {str(e)}")
+            entry_pipeline_stats.record('ml', False)
+            continue
+        batch = batches.setdefault(id(ml_model), (ml_model, [], []))
+        batch[1].append(symbol)
+        batch[2].append(row)
+
+    for ml_model, batch_symbols, rows in batches.values():
+        probabilities = _score(ml_model, batch_symbols, rows)
+        # NaN (unscored) compares False, so those symbols are ruled out
+        passed = probabilities >= ML_MIN_PROBABILITY
+        entry_pipeline_stats.record_many('ml', len(rows), int(passed.sum()))
+        for symbol, prob, ok in zip(batch_symbols, probabilities, passed):
+            if np.isnan(prob):
+                continue
+            logging.info(f"ML model confidence for {symbol}: {prob:.2f}")
+            if ok:
+                approved.add(symbol)
+            else:
+                logging.info(f"ML model suggests low success probability for {symbol}, skipping trade")
+    return approved
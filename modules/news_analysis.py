@@ -1,22 +1,21 @@
 import streamlit as st
 from datetime import datetime, timedelta
-import yfinance as yf
 import trafilatura
 import urllib.parse
 import pandas as pd
 import json
 from bs4 import BeautifulSoup
+from modules.ticker_metadata import get_ticker_info, get_ticker_calendar, get_ticker_news
 
 @st.cache_data(ttl=60)  # Cache for 1 minute
 def get_stock_news(symbol):
     """Fetch news from multiple sources"""
     try:
         # Get company name for better Google News search
-        stock = yf.Ticker(symbol)
-        company_name = stock.info.get('longName', symbol)
+        company_name = get_ticker_info(symbol, ['longName']).get('longName', symbol)
 
         # Get Yahoo Finance news
-        yf_news = stock.news or []
+        yf_news = list(get_ticker_news(symbol))
 
         # Get Google News
         google_news = get_google_news(company_name)
@@ -109,8 +108,7 @@ def format_financial_value(value):
 def get_earnings_calendar(symbol):
     """Fetch earnings calendar information"""
     try:
-        stock = yf.Ticker(symbol)
-        calendar = stock.calendar
+        calendar = get_ticker_calendar(symbol)
         if calendar is None:
             return None
 
@@ -120,7 +118,7 @@ def get_earnings_calendar(symbol):
         earnings_estimate = calendar.get('Earnings Estimate')
 
         # Get actual values from info if available
-        info = stock.info
+        info = get_ticker_info(symbol, ['revenueEstimate', 'forwardEps'])
         if not revenue_estimate and 'revenueEstimate' in info:
             revenue_estimate = info['revenueEstimate']
         if not earnings_estimate and 'forwardEps' in info:
@@ -137,11 +135,15 @@ def get_earnings_calendar(symbol):
         st.error(f"Error fetching earnings calendar for {symbol}: {str(e)}")
         return None
 
+ANALYST_FIELDS = [
+    'recommendationKey', 'recommendationMean', 'numberOfAnalystOpinions',
+    'targetMeanPrice', 'targetHighPrice', 'targetLowPrice'
+]
+
 def get_analyst_ratings(symbol):
     """Fetch analyst ratings for the stock"""
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        info = get_ticker_info(symbol, ANALYST_FIELDS)
 
         ratings = {
             'Recommendation': info.get('recommendationKey', 'N/A').upper(),
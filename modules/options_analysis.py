@@ -2,46 +2,53 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime
-import yfinance as yf
 import numpy as np
+from modules.market_data import get_provider
+from modules.single_flight import SingleFlight
+
+# Concurrent requests for the same chain share one in-flight fetch
+_chain_flights = SingleFlight()
 
 @st.cache_data(ttl=60)  # Cache for 1 minute
 def get_options_chain(symbol, num_expiries):
     """Fetch options chain data for a given symbol"""
     try:
-        stock = yf.Ticker(symbol)
-        # Get all available expiration dates
-        expirations = stock.options
+        return _chain_flights.do((symbol, num_expiries), _fetch_options_chain, symbol, num_expiries)
+    except Exception as e:
+        st.error(f"Error fetching options data for {symbol}: {str(e)}")
+        return pd.DataFrame(), []
 
-        if not expirations:
-            return pd.DataFrame(), []
+def _fetch_options_chain(symbol, num_expiries):
+    """Download and combine the option chains for the nearest expirations"""
+    provider = get_provider()
+    # Get all available expiration dates
+    expirations = provider.option_expirations(symbol)
 
-        # Get options data for each expiration
-        all_options = []
+    if not expirations:
+        return pd.DataFrame(), []
 
-        # Use selected number of expiration dates
-        for exp in expirations[:num_expiries]:
-            calls = stock.option_chain(exp).calls
-            puts = stock.option_chain(exp).puts
+    # Get options data for each expiration
+    all_options = []
 
-            # Add expiration date and type to the dataframes
-            calls['optionType'] = 'CALL'
-            puts['optionType'] = 'PUT'
-            calls['expiration'] = exp
-            puts['expiration'] = exp
+    # Use selected number of expiration dates
+    for exp in expirations[:num_expiries]:
+        calls, puts = provider.option_chain(symbol, exp)
 
-            # Calculate total value of contracts
-            calls['totalValue'] = calls['volume'] * calls['lastPrice'] * 100
-            puts['totalValue'] = puts['volume'] * puts['lastPrice'] * 100
+        # Add expiration date and type to the dataframes
+        calls['optionType'] = 'CALL'
+        puts['optionType'] = 'PUT'
+        calls['expiration'] = exp
+        puts['expiration'] = exp
 
-            all_options.extend([calls, puts])
+        # Calculate total value of contracts
+        calls['totalValue'] = calls['volume'] * calls['lastPrice'] * 100
+        puts['totalValue'] = puts['volume'] * puts['lastPrice'] * 100
 
-        # Combine all options data
-        options_df = pd.concat(all_options, ignore_index=True)
-        return options_df, expirations
-    except Exception as e:
-        st.error(f"Error fetching options data for {symbol}: {str(e)}")
-        return pd.DataFrame(), []
+        all_options.extend([calls, puts])
+
+    # Combine all options data
+    options_df = pd.concat(all_options, ignore_index=True)
+    return options_df, expirations
 
 def calculate_options_statistics(options_df):
     """Calculate advanced options statistics"""
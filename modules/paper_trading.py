@@ -10,7 +10,7 @@ class PaperTrading:
     def __init__(self, symbol):
         self.symbol = symbol
         self.data = get_historical_data(symbol)
-        self.current_price = self.data['Close'].iloc[-1]
+        self.current_price = float(self.data['Close'].iloc[-1])  # Bars are float32; trades are saved as JSON
         self.strategy = TradingStrategy(symbol)
 
     def execute_trade(self, action, quantity, stop_loss, take_profit, trade_type='equity', strike=None, expiration=None, option_type=None):
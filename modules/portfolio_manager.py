@@ -1,8 +1,11 @@
 import pandas as pd
 from datetime import datetime
 from modules.trading_strategy import TradingStrategy
-from modules.stock_data import get_sp500_stocks
-from modules.utils import load_trades, save_trades
+from modules.stock_data import get_sp500_stocks, get_historical_data_many
+from modules.indicator_panel import latest_indicator_table
+from modules.entry_pipeline import entry_pipeline_stats
+from modules.screener import screen_universe
+from modules.utils import load_trades
 import logging
 
 class PortfolioManager:
@@ -54,32 +57,48 @@ class PortfolioManager:
         stats = self.get_portfolio_stats()
         self.max_position_size = stats['current_capital'] * 0.02
 
+        # Warm the bar store for the whole universe with a handful of grouped requests,
+        # so each strategy's history lookup below is served locally
+        frames = get_historical_data_many(list(self.trading_strategies))
+
+        # Compute every symbol's indicators in one vectorized pass and hand each strategy its row
+        indicator_table = None
+        try:
+            indicator_table = latest_indicator_table(frames)
+            for symbol, latest in indicator_table.iterrows():
+                self.trading_strategies[symbol].prime_indicators(latest.to_dict())
+        except Exception as e:
+            logging.error(f"Error computing indicator panel, strategies will compute their own: {e}")
+
+        entry_pipeline_stats.reset()
         trades = load_trades()
-        for symbol, strategy in self.trading_strategies.items():
-            try:
-                # Diversification: skip if already holding this symbol
-                if any(t for t in trades if t['symbol'] == symbol and t['status'] == 'open'):
-                    logging.info(f"Skipping {symbol} - already an open position")
-                    continue
 
+        # Diversification: skip symbols we already hold
+        held = {t['symbol'] for t in trades if t['status'] == 'open'}
+
+        # Evaluate the entry rules for the whole universe at once; only candidates are traded below
+        candidates = screen_universe(self.trading_strategies, indicator_table, exclude=held)
+        for symbol, trade_type in candidates.items():
+            strategy = self.trading_strategies[symbol]
+            try:
                 # Capital check: need at least max_position_size available to initiate a new trade
                 if self.available_capital < self.max_position_size:
                     logging.info("Insufficient available capital for new positions, stopping signal check")
                     break  # exit loop if we cannot fund further positions
 
-                logging.info(f"Analyzing {symbol} for trade opportunities...")
-                trade_type = strategy.should_enter_trade()
-                if trade_type:
-                    trade = strategy.execute_trade(trade_type)
-                    if trade:
-                        # Deduct used capital: for equity, entry cost; for options, margin equal to max_loss
-                        cost = trade['entry_price'] * trade.get('quantity', 1) if trade['type'] == 'equity' else trade['max_loss']
-                        self.available_capital -= cost
-                        signals.append(trade)
-                        logging.info(f"Opened new {trade['type']} position for {symbol} (Strategy: {trade.get('strategy_type', 'N/A')})")
+                trade = strategy.execute_trade(trade_type)
+                if trade:
+                    # Deduct used capital: for equity, entry cost; for options, margin equal to max_loss
+                    cost = trade['entry_price'] * trade.get('quantity', 1) if trade['type'] == 'equity' else trade['max_loss']
+                    self.available_capital -= cost
+                    signals.append(trade)
+                    logging.info(f"Opened new {trade['type']} position for {symbol} (Strategy: {trade.get('strategy_type', 'N/A')})")
             except Exception as e:
                 logging.error(f"Error checking signals for {symbol}: {e}")
                 continue
+
+        # Shows how many options-chain and ratings lookups the cheaper stages saved
+        entry_pipeline_stats.log_summary()
         return signals
 
     def monitor_portfolio(self):
@@ -92,35 +111,37 @@ class PortfolioManager:
         }
 
         trades = load_trades()
-        updated_trades = []
+        was_open = [trade['status'] == 'open' for trade in trades]
 
-        for trade in trades:
-            strategy = self.trading_strategies.get(trade['symbol'])
-            if not strategy:
+        # Each strategy checks all of its symbol's open positions in one pass and saves the result
+        open_symbols = {trade['symbol'] for trade in trades if trade['status'] == 'open'}
+        for symbol in sorted(open_symbols):
+            strategy = self.trading_strategies.get(symbol)
+            if strategy:
+                trades = strategy.monitor_positions()
+
+        for trade, opened in zip(trades, was_open):
+            if trade['symbol'] not in self.trading_strategies:
                 continue
 
             if trade['status'] == 'open':
                 portfolio_summary['total_positions'] += 1
-                # Update position status
-                updated_trade = strategy.monitor_position(trade)
-                if updated_trade['status'] == 'closed':
-                    self.available_capital += (
-                        updated_trade['exit_price'] * updated_trade['quantity']
-                        if updated_trade['type'] == 'equity'
-                        else updated_trade['profit']
-                    )
-                    portfolio_summary['total_profit_loss'] += updated_trade['profit']
-                    portfolio_summary['closed_positions'].append(updated_trade)
-                    logging.info(f"Closed position for {trade['symbol']}: Profit = ${updated_trade['profit']:.2f}")
-                else:
-                    portfolio_summary['open_positions'].append(updated_trade)
-                updated_trades.append(updated_trade)
+                portfolio_summary['open_positions'].append(trade)
+            elif opened:
+                # Closed by this pass
+                portfolio_summary['total_positions'] += 1
+                self.available_capital += (
+                    trade['exit_price'] * trade['quantity']
+                    if trade['type'] == 'equity'
+                    else trade['profit']
+                )
+                portfolio_summary['total_profit_loss'] += trade['profit']
+                portfolio_summary['closed_positions'].append(trade)
+                logging.info(f"Closed position for {trade['symbol']}: Profit = ${trade['profit']:.2f}")
             else:
                 portfolio_summary['closed_positions'].append(trade)
                 portfolio_summary['total_profit_loss'] += trade['profit']
-                updated_trades.append(trade)
 
-        save_trades(updated_trades)
         return portfolio_summary
 
     def get_portfolio_stats(self):
@@ -140,8 +161,8 @@ class PortfolioManager:
                 if trade['type'] == 'equity':
                     unrealized_pnl += (current_price - trade['entry_price']) * trade['quantity']
                 else:
-                    # For options, use a method in TradingStrategy to calculate current P&L
-                    unrealized_pnl += strategy.calculate_options_pnl(trade)
+                    # Same valuation monitor_positions exits on; nothing to add while no chain is available
+                    unrealized_pnl += strategy.calculate_options_pnl(trade) or 0
     
         current_capital = self.initial_capital + total_profit + unrealized_pnl
         return {
@@ -0,0 +1,87 @@
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from time import monotonic, sleep
+
+# Sustained requests per second and burst size for outbound market-data calls
+MARKET_DATA_RATE = float(os.environ.get('MARKET_DATA_RATE', 2.0))
+MARKET_DATA_BURST = float(os.environ.get('MARKET_DATA_BURST', 5))
+
+# Floor the adaptive rate can be pushed down to when the provider pushes back
+MARKET_DATA_MIN_RATE = float(os.environ.get('MARKET_DATA_MIN_RATE', 0.1))
+
+# Tokens one grouped download costs, however many symbols it carries. yf.download fans out
+# into one request per symbol, but charging for each would stall every other caller behind a
+# single large chunk; throttled downloads slow the shared rate down instead.
+MARKET_DATA_BATCH_COST = float(os.environ.get('MARKET_DATA_BATCH_COST', 1))
+
+def is_rate_limit_error(error):
+    """Check whether an exception means the provider is throttling us"""
+    if type(error).__name__ == 'YFRateLimitError':
+        return True
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    # Older yfinance versions only carry the HTTP reason phrase of the 429 in the message
+    return "Too Many Requests" in str(error)
+
+class TokenBucket:
+    """Thread-safe token bucket with additive-increase/multiplicative-decrease rate adaptation"""
+
+    def __init__(self, rate, burst, min_rate=0.1, recovery_step=0.05, backoff_factor=0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min(min_rate, rate)
+        self.recovery_step = recovery_step
+        self.backoff_factor = backoff_factor
+        self.tokens = burst
+        self.updated = monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available"""
+        with self.lock:
+            self._refill()
+            # Reserve now and wait off the lock; this also lets a large batch borrow past the burst size
+            self.tokens -= tokens
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            sleep(wait)
+
+    def record_success(self):
+        """Creep the rate back towards its configured maximum after a successful call"""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def record_throttle(self):
+        """Cut the rate and drain the bucket after the provider rejected a call"""
+        with self.lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            self.tokens = min(self.tokens, 0)
+            logging.warning(f"Market data rate limit hit, slowing to {self.rate:.2f} requests/sec")
+
+    @contextmanager
+    def request(self, tokens=1):
+        """Acquire before an outbound call and adapt the rate based on how it went"""
+        self.acquire(tokens)
+        try:
+            yield
+        except Exception as e:
+            if is_rate_limit_error(e):
+                self.record_throttle()
+            raise
+        self.record_success()
+
+# Shared by every yfinance call site in the process
+market_data_limiter = TokenBucket(MARKET_DATA_RATE, MARKET_DATA_BURST, MARKET_DATA_MIN_RATE)
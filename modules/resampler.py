@@ -0,0 +1,117 @@
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from modules.bars import aggregate_bars, compact_bars
+from modules.stock_data import get_historical_data
+
+# Intervals from finest to coarsest; a timeframe can be built from any finer one that divides it
+INTERVALS = ['1m', '2m', '5m', '15m', '30m', '1h', '1d', '1wk']
+INTRADAY_LENGTHS = {
+    '1m': timedelta(minutes=1),
+    '2m': timedelta(minutes=2),
+    '5m': timedelta(minutes=5),
+    '15m': timedelta(minutes=15),
+    '30m': timedelta(minutes=30),
+    '1h': timedelta(hours=1),
+}
+
+# Intraday buckets are counted from the regular session open, like the provider's own hourly bars
+SESSION_OPEN = timedelta(hours=9, minutes=30)
+
+def check_intervals(base_interval, interval):
+    """Raise ValueError unless `interval` can be built from `base_interval` bars"""
+    if base_interval not in INTERVALS or interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval: {base_interval if base_interval not in INTERVALS else interval}")
+    if INTERVALS.index(interval) < INTERVALS.index(base_interval):
+        raise ValueError(f"Cannot build {interval} bars from coarser {base_interval} bars")
+    if interval in INTRADAY_LENGTHS and INTRADAY_LENGTHS[interval] % INTRADAY_LENGTHS[base_interval]:
+        raise ValueError(f"{interval} is not a multiple of {base_interval}")
+
+def bucket_labels(index, interval):
+    """Start of the `interval` bucket each timestamp falls into"""
+    days = index.normalize()
+    if interval == '1wk':
+        return days - pd.to_timedelta(days.dayofweek, unit='D')
+    if interval == '1d':
+        return days
+    length = pd.Timedelta(INTRADAY_LENGTHS[interval])
+    since_open = index - days - SESSION_OPEN
+    return days + SESSION_OPEN + (since_open // length) * length
+
+def resample_bars(df, interval):
+    """Aggregate sorted bars into `interval` buckets in one vectorized pass"""
+    if df is None or df.empty:
+        return df
+
+    labels = bucket_labels(df.index, interval)
+    keys = labels.asi8
+    # Bars are sorted, so each bucket is a contiguous run starting where the label changes
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    resampled = aggregate_bars(df, starts)
+    resampled.index = labels[starts]
+    return compact_bars(resampled)
+
+class ResampleCache:
+    """Resampled bars per (symbol, base interval, interval), extended as new base bars arrive"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def resample(self, symbol, base_interval, base, interval):
+        """Return `base` resampled to `interval`, recomputing only the first and the last (possibly partial) buckets
+
+        A rolling period moves the start of `base` forward between calls, so cached buckets
+        before the new start are dropped and the one it falls into is rebuilt from `base`.
+        """
+        key = (symbol, base_interval, interval)
+        with self.lock:
+            entry = self.entries.get(key)
+
+        df = None
+        if entry is not None and not base.empty:
+            first_timestamp, cached = entry
+            if first_timestamp <= base.index[0]:
+                first_label = bucket_labels(base.index[:1], interval)[0]
+                middle = cached.iloc[:-1]
+                middle = middle[middle.index > first_label]
+                position = base.index.searchsorted(cached.index[-1])
+                # A different close before the last bucket means the base history was rewritten
+                if len(middle) and position > 0 and float(base['Close'].iloc[position - 1]) == float(middle['Close'].iloc[-1]):
+                    head = resample_bars(base.iloc[:base.index.searchsorted(middle.index[0])], interval)
+                    df = pd.concat([head, middle, resample_bars(base.iloc[position:], interval)])
+
+        if df is None:
+            df = resample_bars(base, interval)
+            logging.info(f"Resampled {len(base)} {base_interval} bars for {symbol} into {len(df)} {interval} bars")
+
+        if not base.empty:
+            with self.lock:
+                self.entries[key] = (base.index[0], df)
+        return df
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+_resample_cache = ResampleCache()
+
+def get_resampled_data(symbol, interval, base_interval='1d', period='1y'):
+    """Bars for `interval` built from the stored `base_interval` history, with no extra provider call"""
+    check_intervals(base_interval, interval)
+    base = get_historical_data(symbol, period=period, interval=base_interval)
+    if interval == base_interval:
+        return base
+    return _resample_cache.resample(symbol, base_interval, base, interval)
+
+def get_multi_timeframe_data(symbol, intervals, base_interval='1d', period='1y'):
+    """Bars for several timeframes from a single base history fetch"""
+    for interval in intervals:
+        check_intervals(base_interval, interval)
+    base = get_historical_data(symbol, period=period, interval=base_interval)
+    return {
+        interval: base if interval == base_interval else _resample_cache.resample(symbol, base_interval, base, interval)
+        for interval in intervals
+    }
@@ -0,0 +1,152 @@
+import ast
+from functools import reduce
+import numpy as np
+import pandas as pd
+
+class RuleError(ValueError):
+    """A rule expression uses syntax the rule engine does not support"""
+
+_COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_ARITHMETIC = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+}
+
+def _compile(node, names):
+    """Turn an expression node into a function of a name -> value lookup"""
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(value, names) for value in node.values]
+        conjunction = isinstance(node.op, ast.And)
+        combine = np.logical_and if conjunction else np.logical_or
+
+        def bool_op(env):
+            result = parts[0](env)
+            for part in parts[1:]:
+                # Once a scalar result is decided the remaining operands are skipped, as in Python,
+                # so e.g. a missing put/call ratio does not matter when the flow is strong anyway
+                if np.ndim(result) == 0 and bool(result) != conjunction:
+                    return result
+                result = combine(result, part(env))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda env: np.logical_not(operand(env))
+        if isinstance(node.op, ast.USub):
+            return lambda env: np.negative(operand(env))
+
+    if isinstance(node, ast.Compare):
+        # a < b <= c is (a < b) and (b <= c), as in Python
+        operands = [_compile(node.left, names)] + [_compile(comparator, names) for comparator in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARISONS:
+                raise RuleError(f"Unsupported comparison: {type(op).__name__}")
+            ops.append(_COMPARISONS[type(op)])
+
+        def compare(env):
+            values = [operand(env) for operand in operands]
+            return reduce(np.logical_and, (op(values[i], values[i + 1]) for i, op in enumerate(ops)))
+        return compare
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        left = _compile(node.left, names)
+        right = _compile(node.right, names)
+        op = _ARITHMETIC[type(node.op)]
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.Name):
+        names.add(node.id)
+        return lambda env: env[node.id]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+        return lambda env: node.value
+
+    raise RuleError(f"Unsupported syntax in rule: {ast.dump(node)}")
+
+def _column(series):
+    """A signal column as a NumPy array; missing values in object columns count as False / NaN"""
+    if series.dtype != object:
+        return series.to_numpy()
+    present = series.dropna()
+    if present.map(lambda value: isinstance(value, (bool, np.bool_))).all():
+        return series.fillna(False).astype(bool).to_numpy()
+    return pd.to_numeric(series, errors='coerce').to_numpy(dtype=float)
+
+class Rule:
+    """A boolean rule over named signals, e.g. "oversold or rsi < rsi_entry"
+
+    Names are looked up in the rule's parameters first and in the signals second. Signals can
+    be a mapping of scalars (one symbol, one trade) or a DataFrame (a universe, or a symbol's
+    history), and the rule compiles once into NumPy operations that handle both.
+    """
+
+    def __init__(self, name, expression, params=None):
+        self.name = name
+        self.expression = expression
+        self.params = dict(params or {})
+        self.names = set()
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise RuleError(f"Invalid rule {name}: {expression}") from e
+        self.predicate = _compile(tree.body, self.names)
+
+    @property
+    def signals(self):
+        """Signal names the rule reads"""
+        return sorted(self.names - set(self.params))
+
+    def _env(self, signals, params, shape=None):
+        env = {}
+        for name in self.names:
+            if name in params:
+                env[name] = params[name]
+            elif isinstance(signals, pd.DataFrame):
+                values = _column(signals[name])
+                env[name] = values if shape is None else values.reshape(shape)
+            else:
+                env[name] = signals[name]
+        return env
+
+    def __call__(self, signals, **params):
+        """Evaluate the rule; returns a bool for scalar signals and a boolean Series for a DataFrame"""
+        result = self.predicate(self._env(signals, {**self.params, **params}))
+        if isinstance(signals, pd.DataFrame):
+            return pd.Series(np.broadcast_to(result, len(signals)), index=signals.index, dtype=bool)
+        return bool(result)
+
+    def variants(self, signals, variants):
+        """Evaluate many parameter sets over a signal table in one broadcast pass
+
+        `variants` maps a label to parameter overrides; returns one boolean column per label.
+        """
+        labels = list(variants)
+        params = dict(self.params)
+        for name in self.names & set().union(*(variants[label] for label in labels)):
+            params[name] = np.array([variants[label].get(name, self.params.get(name)) for label in labels])[None, :]
+
+        # Signals become (rows, 1) columns and parameters (1, variants) rows, so every
+        # comparison broadcasts to a rows x variants mask
+        result = self.predicate(self._env(signals, params, shape=(-1, 1)))
+        result = np.broadcast_to(result, (len(signals), len(labels)))
+        return pd.DataFrame(result, index=signals.index, columns=labels)
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.expression!r})"
+
+def compile_rules(definitions, params=None):
+    """Compile {name: expression} definitions sharing one parameter set"""
+    return {name: Rule(name, expression, params) for name, expression in definitions.items()}
@@ -0,0 +1,150 @@
+import logging
+import numpy as np
+import pandas as pd
+from modules.entry_pipeline import entry_pipeline_stats
+from modules.indicator_graph import indicator_graph
+from modules.ml_scoring import ml_approved
+from modules.trading_rules import equity_technical, options_technical, analyst_approves, options_flow
+
+BOOLEAN_SIGNALS = [
+    'oversold', 'overbought', 'uptrend', 'near_support', 'near_resistance',
+    'macd_bullish', 'below_bollinger', 'above_bollinger',
+]
+
+def technical_signal_frame(indicators):
+    """Technical signals for every symbol of a latest-indicator table, same columns as get_technical_signals"""
+    price = indicators['price']
+    rsi = indicators['rsi']
+    sma_20 = indicators['sma_20']
+    sma_50 = indicators['sma_50']
+    macd = indicators['macd']
+    signal = indicators['macd_signal']
+    mid = indicators['bollinger_mid']
+    upper = indicators['bollinger_upper']
+    lower = indicators['bollinger_lower']
+    atr = indicators['atr']
+    support = indicators['support']
+    resistance = indicators['resistance']
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame = pd.DataFrame({
+            'price': price,
+            'rsi': rsi,
+            'oversold': rsi < 30,
+            'overbought': rsi > 70,
+            'uptrend': sma_20 > sma_50,
+            'support': support,
+            'resistance': resistance,
+            'near_support': price <= support * 1.02,
+            'near_resistance': price >= resistance * 0.98,
+            'sma_20': sma_20,
+            'sma_50': sma_50,
+            'macd': macd,
+            'macd_signal_line': signal,
+            'macd_bullish': macd > signal,
+            'bollinger_upper': upper,
+            'bollinger_lower': lower,
+            'bollinger_width': np.where(mid != 0, (upper - lower) / mid, 0),
+            'below_bollinger': price < lower,
+            'above_bollinger': price > upper,
+            'atr': atr,
+            'atr_percent': np.where(price != 0, atr / price * 100, 0),
+        }, index=indicators.index)
+
+    # Same rows the per-symbol path rejects as failed calculations
+    valid = indicators[['price', 'rsi', 'sma_20', 'sma_50', 'support', 'resistance']].notna().all(axis=1)
+    return frame[valid]
+
+# Indicator graph nodes behind each column of the latest-indicator table
+HISTORY_NODES = {
+    'price': 'close',
+    'rsi': 'rsi_14',
+    'sma_20': 'sma_20',
+    'sma_50': 'sma_50',
+    'macd': 'macd',
+    'macd_signal': 'macd_signal',
+    'bollinger_mid': 'sma_20',
+    'bollinger_upper': 'bollinger_upper',
+    'bollinger_lower': 'bollinger_lower',
+    'atr': 'atr_14',
+    'support': 'support_20',
+    'resistance': 'resistance_20',
+}
+
+def technical_signal_history(symbol, df):
+    """Technical signals for every bar of a symbol's history, for replaying the entry rules"""
+    nodes = indicator_graph.frame(symbol, df, sorted(set(HISTORY_NODES.values())))
+    indicators = pd.DataFrame({column: nodes[node] for column, node in HISTORY_NODES.items()}, index=df.index)
+    return technical_signal_frame(indicators)
+
+def _signal_frame(symbols, fetch, kind):
+    """Collect one signal dict per symbol into a frame, leaving out symbols whose lookup fails"""
+    rows = {}
+    for symbol in symbols:
+        try:
+            rows[symbol] = dict(fetch(symbol))
+        except Exception as e:
+            logging.error(f"Error getting {kind} signals for {symbol}: {str(e)}")
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+def screen_universe(strategies, indicators, exclude=()):
+    """Evaluate the entry rules over a whole universe and return {symbol: trade_type} for the candidates
+
+    Technical rules run as column masks over every symbol at once; analyst and options data are
+    looked up only for the symbols that survive the stage before, exactly as in should_enter_trade.
+    """
+    symbols = [symbol for symbol in strategies if symbol not in exclude]
+    if indicators is None:
+        indicators = pd.DataFrame()
+    tech = technical_signal_frame(indicators.loc[indicators.index.intersection(symbols)]) if not indicators.empty else None
+
+    # Symbols the panel could not cover fall back to their own technical signals
+    uncovered = [symbol for symbol in symbols if indicators.empty or symbol not in indicators.index]
+    fallback = _signal_frame(uncovered, lambda symbol: strategies[symbol].get_technical_signals(), 'technical')
+    if not fallback.empty:
+        fallback = fallback[fallback['price'].notna()]
+        tech = fallback if tech is None else pd.concat([tech, fallback])
+    if tech is None or tech.empty:
+        return {}
+    tech[BOOLEAN_SIGNALS] = tech[BOOLEAN_SIGNALS].astype(bool)
+    tech = tech.reindex([symbol for symbol in symbols if symbol in tech.index])
+
+    # Stage 1: technical preconditions, vectorized
+    equity_setup = equity_technical(tech)
+    technical_pass = equity_setup | options_technical(tech)
+    entry_pipeline_stats.record_many('technical', len(tech), int(technical_pass.sum()))
+
+    # Stage 2: analyst ratings for the survivors
+    survivors = tech.index[technical_pass]
+    analyst = _signal_frame(survivors, lambda symbol: strategies[symbol].get_analyst_signals(), 'analyst')
+    if analyst.empty:
+        return {}
+    analyst_pass = analyst_approves(analyst).astype(bool)
+    entry_pipeline_stats.record_many('analyst', len(analyst), int(analyst_pass.sum()))
+    approved = analyst.index[analyst_pass]
+
+    # Stage 3: options flow, only where the equity setup did not already match
+    equity_candidates = approved[equity_setup.loc[approved].to_numpy()]
+    options_needed = approved.difference(equity_candidates, sort=False)
+    options = _signal_frame(options_needed, lambda symbol: strategies[symbol].get_options_signals(), 'options')
+    options_candidates = pd.Index([])
+    if not options.empty:
+        options_pass = options_flow(options).astype(bool)
+        entry_pipeline_stats.record_many('options', len(options), int(options_pass.sum()))
+        options_candidates = options.index[options_pass]
+
+    trade_types = {}
+    for symbol in symbols:
+        if symbol in equity_candidates:
+            trade_types[symbol] = 'equity'
+        elif symbol in options_candidates:
+            trade_types[symbol] = 'options'
+
+    # Stage 4: the ML model, if one is attached, scoring every remaining symbol in one batch;
+    # its features include options flow, so this pulls the options chain for equity candidates too
+    scored = ml_approved(strategies, list(trade_types))
+    candidates = {symbol: trade_type for symbol, trade_type in trade_types.items() if symbol in scored}
+
+    logging.info(f"Screened {len(tech)} symbols: {len(survivors)} passed technical rules, "
+                 f"{len(approved)} analyst approval, {len(candidates)} candidates")
+    return candidates
@@ -0,0 +1,39 @@
+import threading
+from types import MappingProxyType
+
+class SignalSnapshot:
+    """Technical, options and analyst signals for one symbol at one bar, each computed at most once
+
+    Every consumer in a cycle gets the same read-only mappings. A strategy replaces its snapshot
+    when its bars change, so nothing computed for the previous bar is handed out again.
+    """
+
+    def __init__(self, bar_key, technical, options, analyst):
+        self.bar_key = bar_key
+        self.lock = threading.Lock()
+        self.sources = {'technical': technical, 'options': options, 'analyst': analyst}
+        self.values = {}
+
+    def _get(self, kind):
+        # The lock is held while computing so concurrent readers wait for one computation
+        with self.lock:
+            if kind not in self.values:
+                self.values[kind] = MappingProxyType(dict(self.sources[kind]()))
+            return self.values[kind]
+
+    @property
+    def technical(self):
+        return self._get('technical')
+
+    @property
+    def options(self):
+        return self._get('options')
+
+    @property
+    def analyst(self):
+        return self._get('analyst')
+
+    def computed(self):
+        """Kinds of signals computed so far"""
+        with self.lock:
+            return sorted(self.values)
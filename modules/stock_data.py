@@ -1,26 +1,161 @@
-import yfinance as yf
 import pandas as pd
-import streamlit as st
 from datetime import datetime, timedelta
 import logging
+import threading
+from pathlib import Path
+from time import monotonic
 from time import sleep
+from modules.rate_limiter import is_rate_limit_error, market_data_limiter
+from modules.market_data import get_provider
+from modules.ticker_metadata import get_ticker_info
+from modules.bars import compact_bars
+from modules.single_flight import SingleFlight
+from modules.bar_store import load_bars, save_bars, append_bars, is_fresh, covers_start, slice_from, merge_bars, align_timestamp
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-@st.cache_data(ttl=60)  # Cache for 1 minute only
+# Concurrent requests for the same key (dashboard and trading loop, parallel scans) share one fetch
+_history_flights = SingleFlight()
+
+class HistoryCache:
+    """In-memory bars per (symbol, interval) that serve any period contained in the cached window"""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, symbol, interval, start_date):
+        """Return the cached bars from start_date on, or None if the cached window is stale or too short"""
+        with self.lock:
+            entry = self.entries.get((symbol, interval))
+        if entry is None:
+            return None
+
+        window_start, loaded_at, df = entry
+        if monotonic() - loaded_at > self.ttl or window_start > start_date:
+            return None
+
+        # A label slice on the sorted index shares the cached data rather than copying it
+        return df.loc[align_timestamp(start_date, df.index):]
+
+    def put(self, symbol, interval, start_date, df):
+        """Remember the bars loaded for a window starting at start_date"""
+        if df is None or df.empty:
+            return
+        with self.lock:
+            self.entries[(symbol, interval)] = (start_date, monotonic(), df)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+_history_cache = HistoryCache(ttl=60)  # Cache for 1 minute only
+
+# Index membership changes a few times a quarter, so the constituent list is kept on disk for days
+SP500_SNAPSHOT_PATH = Path("data/sp500.csv")
+SP500_SNAPSHOT_TTL = timedelta(days=7)
+SP500_REFRESH_RETRY = timedelta(hours=1)  # Wait this long before retrying a failed refresh or first scrape
+
+_sp500_snapshot = None
+_sp500_refresh_lock = threading.Lock()
+_sp500_refreshing = False
+_sp500_last_refresh = None
+
+def _load_sp500_snapshot():
+    """Load the constituent snapshot from memory or disk, or None if there is none"""
+    global _sp500_snapshot
+    if _sp500_snapshot is None and SP500_SNAPSHOT_PATH.exists():
+        try:
+            df = pd.read_csv(SP500_SNAPSHOT_PATH, dtype=str)
+            if not df.empty:
+                _sp500_snapshot = df
+        except Exception as e:
+            logging.warning(f"Failed to read S&P 500 snapshot: {str(e)}")
+    return _sp500_snapshot
+
+def _save_sp500_snapshot(df):
+    """Persist a freshly scraped constituent list and make it the in-memory snapshot"""
+    global _sp500_snapshot
+    if df.empty:
+        return
+    _sp500_snapshot = df
+    try:
+        SP500_SNAPSHOT_PATH.parent.mkdir(exist_ok=True)
+        df.to_csv(SP500_SNAPSHOT_PATH, index=False)
+    except Exception as e:
+        logging.warning(f"Failed to write S&P 500 snapshot: {str(e)}")
+
+def _sp500_snapshot_is_stale():
+    if not SP500_SNAPSHOT_PATH.exists():
+        return True
+    age = datetime.now() - datetime.fromtimestamp(SP500_SNAPSHOT_PATH.stat().st_mtime)
+    return age > SP500_SNAPSHOT_TTL
+
+def _refresh_sp500_snapshot(max_retries, delay_between_retries):
+    global _sp500_refreshing
+    try:
+        _save_sp500_snapshot(_scrape_sp500_stocks(max_retries, delay_between_retries))
+    finally:
+        with _sp500_refresh_lock:
+            _sp500_refreshing = False
+
+def _sp500_refreshed_recently():
+    return _sp500_last_refresh is not None and datetime.now() - _sp500_last_refresh < SP500_REFRESH_RETRY
+
+def _start_sp500_refresh(max_retries, delay_between_retries):
+    """Refresh the snapshot on a background thread unless a refresh is already running"""
+    global _sp500_refreshing, _sp500_last_refresh
+    with _sp500_refresh_lock:
+        if _sp500_refreshing:
+            return
+        if _sp500_refreshed_recently():
+            return
+        _sp500_refreshing = True
+        _sp500_last_refresh = datetime.now()
+
+    logging.info("S&P 500 snapshot is stale, refreshing in the background")
+    threading.Thread(
+        target=_refresh_sp500_snapshot,
+        args=(max_retries, delay_between_retries),
+        daemon=True
+    ).start()
+
 def get_sp500_stocks(max_retries=3, delay_between_retries=5):
+    """Get the S&P 500 constituents, serving the persisted snapshot and refreshing it in the background when stale"""
+    if not get_provider().cache_locally:
+        # Recording and replay runs need the list to go through the provider, not the local snapshot
+        return _scrape_sp500_stocks(max_retries, delay_between_retries)
+
+    global _sp500_last_refresh
+    snapshot = _load_sp500_snapshot()
+    if snapshot is None:
+        # A failed first scrape is retried hourly like a background refresh, not on every call
+        with _sp500_refresh_lock:
+            if _sp500_refreshed_recently():
+                return pd.DataFrame(columns=['Symbol', 'Security'])
+
+        # Nothing to serve yet, so the very first run has to wait for the scrape
+        df = _scrape_sp500_stocks(max_retries, delay_between_retries)
+        if df.empty:
+            with _sp500_refresh_lock:
+                _sp500_last_refresh = datetime.now()
+        _save_sp500_snapshot(df)
+        return df.copy()
+
+    if _sp500_snapshot_is_stale():
+        _start_sp500_refresh(max_retries, delay_between_retries)
+
+    return snapshot.copy()
+
+def _scrape_sp500_stocks(max_retries=3, delay_between_retries=5):
     """Fetch S&P 500 stocks list with retry mechanism and improved error handling"""
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
     retries = 0
 
     while retries < max_retries:
         try:
-            tables = pd.read_html(url)
-            if not tables:
-                raise ValueError("No tables found on the page")
-
-            df = tables[0]
+            df = get_provider().sp500_constituents()
 
             # Validate required columns exist
             required_columns = ['Symbol', 'Security']
@@ -51,12 +186,14 @@ def get_sp500_stocks(max_retries=3, delay_between_retries=5):
                 # Return empty DataFrame with correct columns for error handling
                 return pd.DataFrame(columns=['Symbol', 'Security'])
 
-@st.cache_data(ttl=60)  # Cache for 1 minute only
+STOCK_INFO_FIELDS = [
+    'longName', 'sector', 'industry', 'marketCap', 'forwardPE', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow'
+]
+
 def get_stock_info(symbol):
     """Get basic stock information"""
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        info = get_ticker_info(symbol, STOCK_INFO_FIELDS)
 
         relevant_info = {
             "Company Name": info.get('longName', 'N/A'),
@@ -78,62 +215,217 @@ def get_stock_info(symbol):
             "Last Updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
 
-@st.cache_data(ttl=60)  # Cache for 1 minute only
-def get_historical_data(symbol, period='1y', interval='1d', max_retries=3, delay_between_retries=5):
-    """Fetch historical stock data with improved retry mechanism and rate limiting handling"""
+PERIOD_DAYS = {
+    '1d': 1,
+    '5d': 5,
+    '1mo': 30,
+    '3mo': 90,
+    '6mo': 180,
+    '1y': 365,
+}
+
+def get_period_start(period, end_date):
+    """Calculate the start date for a period string such as '6mo' or '1y'"""
+    return end_date - timedelta(days=PERIOD_DAYS.get(period, 365))  # Default to 1 year
+
+def validate_historical_data(symbol, df):
+    """Raise ValueError if bars are unusable for signal generation"""
+    # Validate data quality
+    required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+    if not all(col in df.columns for col in required_columns):
+        raise ValueError(f"Missing required columns for {symbol}")
+
+    # Check for minimum required data points
+    if len(df) < 50:  # Need at least 50 data points for reliable signals
+        raise ValueError(f"Insufficient historical data for {symbol} (got {len(df)} rows)")
+
+def get_historical_data(symbol, period='1y', interval='1d', max_retries=3, delay_between_retries=5, incremental=True):
+    """Fetch historical stock data, serving shorter periods by slicing a longer cached window"""
+    start_date = get_period_start(period, get_provider().now())
+
+    cached = _history_cache.get(symbol, interval, start_date)
+    if cached is not None:
+        return cached
+
+    # Concurrent callers for the same request share one in-flight fetch
+    df = _history_flights.do(
+        (symbol, period, interval),
+        _load_historical_data,
+        symbol, period, interval, max_retries, delay_between_retries, incremental
+    )
+    _history_cache.put(symbol, interval, start_date, df)
+
+    # Hand out a slice so callers adding indicator columns never touch the cached frame
+    return df.loc[:] if not df.empty else df
+
+def _load_historical_data(symbol, period, interval, max_retries, delay_between_retries, incremental):
+    """Load historical bars, reading the local bar store first and writing fetched bars through to it"""
+    provider = get_provider()
+    end_date = provider.now()
+    start_date = get_period_start(period, end_date)
+
+    # Serve from the on-disk store when it is recent and reaches back far enough
+    stored = compact_bars(load_bars(symbol, interval)) if provider.cache_locally else None
+    has_coverage = stored is not None and covers_start(stored, start_date)
+    if has_coverage and is_fresh(symbol, interval):
+        df = slice_from(stored, start_date)
+        if len(df) >= 50:
+            logging.info(f"Loaded historical data for {symbol} from local bar store")
+            return df
+
+    # Stale but covering store: only ask for bars from the last stored one onwards,
+    # since that last bar may still have been in progress when it was written
+    incremental = incremental and has_coverage
+
     retries = 0
     while retries < max_retries:
         try:
-            stock = yf.Ticker(symbol)
-            end_date = datetime.now()
-
-            # Calculate start date based on period
-            if period == '1d':
-                start_date = end_date - timedelta(days=1)
-            elif period == '5d':
-                start_date = end_date - timedelta(days=5)
-            elif period == '1mo':
-                start_date = end_date - timedelta(days=30)
-            elif period == '3mo':
-                start_date = end_date - timedelta(days=90)
-            elif period == '6mo':
-                start_date = end_date - timedelta(days=180)
-            elif period == '1y':
-                start_date = end_date - timedelta(days=365)
-            else:
-                start_date = end_date - timedelta(days=365)  # Default to 1 year
-
-            df = stock.history(
-                start=start_date,
+            # Keep only OHLCV in compact dtypes everywhere downstream: store, caches and indicators
+            df = compact_bars(provider.history(
+                symbol,
+                start=stored.index[-1] if incremental else start_date,
                 end=end_date,
                 interval=interval
-            )
+            ))
 
-            if df.empty:
+            if incremental:
+                append_bars(symbol, interval, df)
+                df = slice_from(merge_bars(stored, df), start_date)
+                logging.info(f"Incrementally updated historical data for {symbol}")
+            elif df.empty:
                 raise ValueError(f"No data available for {symbol}")
 
-            # Validate data quality
-            required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            if not all(col in df.columns for col in required_columns):
-                raise ValueError(f"Missing required columns for {symbol}")
+            validate_historical_data(symbol, df)
 
-            # Check for minimum required data points
-            if len(df) < 50:  # Need at least 50 data points for reliable signals
-                raise ValueError(f"Insufficient historical data for {symbol} (got {len(df)} rows)")
+            if not incremental and provider.cache_locally:
+                # Write through so the next cold start can read locally
+                save_bars(symbol, interval, merge_bars(stored, df))
 
             logging.info(f"Successfully retrieved historical data for {symbol}")
             return df
 
         except Exception as e:
             retries += 1
-            if "Too Many Requests" in str(e):
-                # Exponential backoff for rate limiting
-                sleep_time = delay_between_retries * (2 ** (retries - 1))
-                logging.warning(f"Rate limit hit for {symbol}, waiting {sleep_time} seconds...")
-                sleep(sleep_time)
+            if is_rate_limit_error(e) and retries < max_retries:
+                # The shared limiter has already slowed down and paces the retry
+                logging.warning(f"Rate limit hit for {symbol}, retrying at reduced rate...")
             elif retries < max_retries:
                 logging.warning(f"Attempt {retries} failed to get data for {symbol}: {str(e)}")
                 sleep(delay_between_retries)
             else:
                 logging.error(f"Failed to get data for {symbol} after {max_retries} attempts: {str(e)}")
                 return pd.DataFrame()
+
+def _download_chunk(symbols, start, end_date, interval, max_retries, delay_between_retries):
+    """Download one grouped request and split it into per-symbol frames
+
+    yf.download does not raise when single symbols fail or get throttled, they just come back
+    empty. Those symbols are downloaded again, and an attempt in which none of them came back
+    is treated as the provider throttling us.
+    """
+    results = {}
+    pending = list(symbols)
+    retries = 0
+    while pending:
+        error = None
+        try:
+            frames = get_provider().download(pending, start, end_date, interval)
+        except Exception as e:
+            frames, error = {}, e
+
+        for symbol, df in frames.items():
+            df = compact_bars(df)
+            if not df.empty:
+                results[symbol] = df
+        missing = [symbol for symbol in pending if symbol not in results]
+        if not missing:
+            break
+
+        retries += 1
+        if error is None and len(missing) == len(pending):
+            # Nothing came back and nothing was raised, so the limiter has not seen this push-back yet
+            market_data_limiter.record_throttle()
+            throttled = True
+        else:
+            throttled = error is not None and is_rate_limit_error(error)
+        reason = str(error) if error is not None else f"no data for {', '.join(missing)}"
+
+        if retries >= max_retries:
+            logging.error(f"Failed to download {len(missing)} of {len(symbols)} symbols after {max_retries} attempts: {reason}")
+            break
+        if throttled:
+            # The shared limiter has already slowed down and paces the retry
+            logging.warning(f"Rate limit hit for batch of {len(pending)} symbols, retrying {len(missing)} at reduced rate...")
+        else:
+            logging.warning(f"Attempt {retries} failed for {len(missing)} of {len(pending)} symbols: {reason}")
+            sleep(delay_between_retries)
+        pending = missing
+    return results
+
+def get_historical_data_many(symbols, period='1y', interval='1d', chunk_size=100, max_retries=3, delay_between_retries=5):
+    """Fetch historical data for many symbols with grouped requests, returning a dict of per-symbol frames"""
+    provider = get_provider()
+    end_date = provider.now()
+    start_date = get_period_start(period, end_date)
+
+    results = {}
+    full_fetch = []
+    incremental_fetch = {}
+
+    # Sort symbols into served-locally, tail-only and full-window fetches
+    for symbol in symbols:
+        stored = compact_bars(load_bars(symbol, interval)) if provider.cache_locally else None
+        if stored is None or not covers_start(stored, start_date):
+            full_fetch.append(symbol)
+            continue
+
+        df = slice_from(stored, start_date)
+        if is_fresh(symbol, interval) and len(df) >= 50:
+            results[symbol] = df
+        else:
+            incremental_fetch[symbol] = stored
+
+    logging.info(
+        f"Batch history for {len(symbols)} symbols: {len(results)} from local store, "
+        f"{len(incremental_fetch)} incremental, {len(full_fetch)} full"
+    )
+
+    for i in range(0, len(full_fetch), chunk_size):
+        chunk = full_fetch[i:i + chunk_size]
+        frames = _download_chunk(chunk, start_date, end_date, interval, max_retries, delay_between_retries)
+        for symbol in chunk:
+            df = frames.get(symbol, pd.DataFrame())
+            try:
+                validate_historical_data(symbol, df)
+            except ValueError as e:
+                logging.error(f"Failed to get data for {symbol}: {str(e)}")
+                results[symbol] = pd.DataFrame()
+                continue
+            if provider.cache_locally:
+                save_bars(symbol, interval, df)
+            results[symbol] = df
+
+    incremental_symbols = list(incremental_fetch)
+    for i in range(0, len(incremental_symbols), chunk_size):
+        chunk = incremental_symbols[i:i + chunk_size]
+        # One request for the chunk, starting at the oldest last-stored bar among its symbols
+        chunk_start = min(incremental_fetch[symbol].index[-1] for symbol in chunk)
+        frames = _download_chunk(chunk, chunk_start, end_date, interval, max_retries, delay_between_retries)
+        for symbol in chunk:
+            stored = incremental_fetch[symbol]
+            new_bars = frames.get(symbol)
+            if new_bars is not None:
+                new_bars = new_bars[new_bars.index >= stored.index[-1]]
+                append_bars(symbol, interval, new_bars)
+            df = slice_from(merge_bars(stored, new_bars), start_date)
+            try:
+                validate_historical_data(symbol, df)
+            except ValueError as e:
+                logging.error(f"Failed to get data for {symbol}: {str(e)}")
+                df = pd.DataFrame()
+            results[symbol] = df
+
+    for symbol, df in results.items():
+        _history_cache.put(symbol, interval, start_date, df)
+
+    return results
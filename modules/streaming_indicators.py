@@ -0,0 +1,399 @@
+import math
+from collections import deque
+from modules.bars import bar_arrays
+from modules.indicator_graph import indicator_graph
+from modules.latest_indicators import EMA_WARMUP
+
+NAN = float('nan')
+
+# Window sums are re-added from scratch this often so floating-point drift cannot build up
+RESYNC_EVERY = 1000
+
+class _WindowSums:
+    """Running sum and sum of squares over the last `window` values"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.updates = 0
+
+    def _add(self, value):
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+            self.total_sq += value * value
+
+    def _remove(self, value):
+        if math.isnan(value):
+            self.nan_count -= 1
+        else:
+            self.total -= value
+            self.total_sq -= value * value
+
+    def _count_update(self):
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            finite = [v for v in self.values if not math.isnan(v)]
+            self.total = math.fsum(finite)
+            self.total_sq = math.fsum(v * v for v in finite)
+
+    def push(self, value):
+        value = float(value)
+        self.values.append(value)
+        self._add(value)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._count_update()
+
+    def replace(self, value):
+        """Revise the most recent value"""
+        value = float(value)
+        self._remove(self.values[-1])
+        self.values[-1] = value
+        self._add(value)
+        self._count_update()
+
+    @property
+    def ready(self):
+        # Same as pandas rolling(window): NaN until the window is full and free of NaNs
+        return len(self.values) == self.window and self.nan_count == 0
+
+    @property
+    def mean(self):
+        return self.total / self.window if self.ready else NAN
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1), matching pandas rolling std"""
+        if not self.ready or self.window < 2:
+            return NAN
+        variance = (self.total_sq - self.total * self.total / self.window) / (self.window - 1)
+        return math.sqrt(max(variance, 0.0))
+
+class StreamingSMA:
+    """Simple moving average, O(1) per bar"""
+
+    def __init__(self, window):
+        self.sums = _WindowSums(window)
+
+    def update(self, value):
+        self.sums.push(value)
+        return self.value
+
+    def replace(self, value):
+        self.sums.replace(value)
+        return self.value
+
+    @property
+    def value(self):
+        return self.sums.mean
+
+class StreamingEMA:
+    """Exponential moving average matching pandas ewm(span, adjust=False), O(1) per bar"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1)
+        self.ema = None
+        self.prev_ema = None
+
+    def _step(self, prev, value):
+        if math.isnan(value):
+            return prev
+        if prev is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * prev
+
+    def update(self, value):
+        self.prev_ema = self.ema
+        self.ema = self._step(self.prev_ema, float(value))
+        return self.value
+
+    def replace(self, value):
+        self.ema = self._step(self.prev_ema, float(value))
+        return self.value
+
+    @property
+    def value(self):
+        return NAN if self.ema is None else self.ema
+
+class StreamingMACD:
+    """MACD line, signal line and histogram, O(1) per bar"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, value):
+        self.fast.update(value)
+        self.slow.update(value)
+        self.signal.update(self.fast.value - self.slow.value)
+        return self.value
+
+    def replace(self, value):
+        self.fast.replace(value)
+        self.slow.replace(value)
+        self.signal.replace(self.fast.value - self.slow.value)
+        return self.value
+
+    @property
+    def value(self):
+        macd_line = self.fast.value - self.slow.value
+        signal_line = self.signal.value
+        return macd_line, signal_line, macd_line - signal_line
+
+class StreamingBollinger:
+    """Bollinger mid, upper and lower bands from running sums, O(1) per bar"""
+
+    def __init__(self, window=20, num_std=2):
+        self.sums = _WindowSums(window)
+        self.num_std = num_std
+
+    def update(self, value):
+        self.sums.push(value)
+        return self.value
+
+    def replace(self, value):
+        self.sums.replace(value)
+        return self.value
+
+    @property
+    def value(self):
+        mid = self.sums.mean
+        std = self.sums.std
+        return mid, mid + self.num_std * std, mid - self.num_std * std
+
+class StreamingRSI:
+    """RSI over simple averages of gains and losses, matching calculate_rsi, O(1) per bar"""
+
+    def __init__(self, periods=14):
+        self.gains = _WindowSums(periods)
+        self.losses = _WindowSums(periods)
+        self.prev_close = None
+        self.last_close = None
+
+    def _gain_loss(self, close):
+        if self.prev_close is None or math.isnan(close) or math.isnan(self.prev_close):
+            return 0.0, 0.0
+        delta = close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    def update(self, close):
+        self.prev_close = self.last_close
+        self.last_close = float(close)
+        gain, loss = self._gain_loss(self.last_close)
+        self.gains.push(gain)
+        self.losses.push(loss)
+        return self.value
+
+    def replace(self, close):
+        self.last_close = float(close)
+        gain, loss = self._gain_loss(self.last_close)
+        self.gains.replace(gain)
+        self.losses.replace(loss)
+        return self.value
+
+    @property
+    def value(self):
+        gain = self.gains.mean
+        loss = self.losses.mean
+        if math.isnan(gain) or math.isnan(loss):
+            return NAN
+        if loss == 0:
+            return 100.0 if gain > 0 else NAN
+        return 100 - (100 / (1 + gain / loss))
+
+class StreamingATR:
+    """Average True Range over a simple average of true ranges, O(1) per bar"""
+
+    def __init__(self, period=14):
+        self.true_ranges = _WindowSums(period)
+        self.prev_close = None
+        self.last_close = None
+
+    def _true_range(self, high, low):
+        high_low = high - low
+        if self.prev_close is None or math.isnan(self.prev_close):
+            return high_low
+        return max(high_low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def update(self, high, low, close):
+        self.prev_close = self.last_close
+        self.last_close = float(close)
+        self.true_ranges.push(self._true_range(float(high), float(low)))
+        return self.value
+
+    def replace(self, high, low, close):
+        self.last_close = float(close)
+        self.true_ranges.replace(self._true_range(float(high), float(low)))
+        return self.value
+
+    @property
+    def value(self):
+        return self.true_ranges.mean
+
+class StreamingRollingExtreme:
+    """Rolling max (or min) over a monotonic deque, amortised O(1) per bar"""
+
+    def __init__(self, window, mode='max'):
+        self.window = window
+        self.is_max = mode == 'max'
+        self.values = deque()
+        self.candidates = deque()  # (position, value), values monotonic from the front
+        self.position = 0
+
+    def _dominates(self, new, old):
+        return new >= old if self.is_max else new <= old
+
+    def _push_candidate(self, position, value):
+        while self.candidates and self._dominates(value, self.candidates[-1][1]):
+            self.candidates.pop()
+        self.candidates.append((position, value))
+        while self.candidates[0][0] <= position - self.window:
+            self.candidates.popleft()
+
+    def update(self, value):
+        value = float(value)
+        self.position += 1
+        self.values.append(value)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        self._push_candidate(self.position, value)
+        return self.value
+
+    def replace(self, value):
+        # Earlier candidates may have been evicted by the old value, so rebuild from the window (O(window))
+        self.values[-1] = float(value)
+        self.candidates.clear()
+        first = self.position - len(self.values) + 1
+        for offset, v in enumerate(self.values):
+            self._push_candidate(first + offset, v)
+        return self.value
+
+    @property
+    def value(self):
+        if len(self.values) < self.window:
+            return NAN
+        return self.candidates[0][1]
+
+class TechnicalIndicatorState:
+    """All indicators used by the trading strategy for one symbol, kept current bar by bar"""
+
+    def __init__(self, symbol=None):
+        self.symbol = symbol
+        self.reset()
+
+    def reset(self):
+        self.rsi = StreamingRSI(14)
+        self.sma_20 = StreamingSMA(20)
+        self.sma_50 = StreamingSMA(50)
+        self.macd = StreamingMACD(12, 26, 9)
+        self.bollinger = StreamingBollinger(20, 2)
+        self.atr = StreamingATR(14)
+        self.support = StreamingRollingExtreme(20, mode='min')
+        self.resistance = StreamingRollingExtreme(20, mode='max')
+        self.last_timestamp = None
+        self.last_bar = None
+        self.bar_count = 0
+
+    def update(self, timestamp, high, low, close):
+        """Feed a new bar"""
+        self.rsi.update(close)
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+        self.support.update(low)
+        self.resistance.update(high)
+        self.last_timestamp = timestamp
+        self.last_bar = (high, low, close)
+        self.bar_count += 1
+
+    def revise(self, high, low, close):
+        """Replace the latest bar, e.g. when the in-progress bar has moved since the last update"""
+        self.rsi.replace(close)
+        self.sma_20.replace(close)
+        self.sma_50.replace(close)
+        self.macd.replace(close)
+        self.bollinger.replace(close)
+        self.atr.replace(high, low, close)
+        self.support.replace(low)
+        self.resistance.replace(high)
+        self.last_bar = (high, low, close)
+
+    def seed(self, df):
+        """Rebuild the state from the tail of a bar history
+
+        Every windowed indicator is exact from the last EMA_WARMUP bars. The EMAs depend on the
+        whole history, so they are taken from the shared indicator graph, which computes and
+        memoizes them for every other consumer of this symbol's bars.
+        """
+        self.reset()
+        self._feed(df, max(len(df) - EMA_WARMUP, 0))
+        self.bar_count = len(df)
+
+        if self.symbol is None:
+            return
+        for ema, name in ((self.macd.fast, 'ema_12'), (self.macd.slow, 'ema_26'), (self.macd.signal, 'macd_signal')):
+            self._seed_ema(ema, indicator_graph.get(self.symbol, df, name))
+
+    @staticmethod
+    def _seed_ema(ema, series):
+        values = series.to_numpy()
+        last = float(values[-1])
+        prev = float(values[-2]) if len(values) > 1 else NAN
+        ema.ema = None if math.isnan(last) else last
+        ema.prev_ema = None if math.isnan(prev) else prev
+
+    def _feed(self, df, start):
+        bars = bar_arrays(df.iloc[start:])
+        for i in range(len(bars.close)):
+            self.update(bars.index[i], float(bars.high[i]), float(bars.low[i]), float(bars.close[i]))
+
+    def sync(self, df):
+        """Bring the state up to date with a bar history, touching only bars it has not seen"""
+        if df is None or df.empty:
+            return self
+
+        if self.last_timestamp is None or self.last_timestamp not in df.index:
+            self.seed(df)
+            return self
+
+        position = df.index.get_loc(self.last_timestamp)
+        # A changed close before our last bar means the history was rewritten (e.g. split-adjusted)
+        prev_close = self.rsi.prev_close
+        if position > 0 and prev_close is not None and float(df['Close'].iloc[position - 1]) != prev_close:
+            self.seed(df)
+            return self
+
+        bar = (float(df['High'].iloc[position]), float(df['Low'].iloc[position]), float(df['Close'].iloc[position]))
+        if bar != self.last_bar:
+            self.revise(*bar)
+        self._feed(df, position + 1)
+        return self
+
+    def latest(self):
+        """Current value of every indicator"""
+        macd_line, signal_line, macd_hist = self.macd.value
+        mid, upper, lower = self.bollinger.value
+        return {
+            'timestamp': self.last_timestamp,
+            'price': self.last_bar[2] if self.last_bar else NAN,
+            'rsi': self.rsi.value,
+            'sma_20': self.sma_20.value,
+            'sma_50': self.sma_50.value,
+            'macd': macd_line,
+            'macd_signal': signal_line,
+            'macd_hist': macd_hist,
+            'bollinger_mid': mid,
+            'bollinger_upper': upper,
+            'bollinger_lower': lower,
+            'atr': self.atr.value,
+            'support': self.support.value,
+            'resistance': self.resistance.value,
+        }
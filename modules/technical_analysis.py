@@ -1,101 +1,74 @@
 import streamlit as st
 import plotly.graph_objects as go
-import pandas as pd
 from modules.stock_data import get_historical_data
+from modules.indicator_graph import indicator_graph
+from modules.downsampling import (
+    DEFAULT_CHART_WIDTH, CANDLE_PIXELS, LINE_PIXELS, max_points, downsample_line, downsample_ohlc
+)
+# The indicator formulas live in modules.indicators, shared with the indicator graph
+from modules.indicators import (
+    calculate_macd, calculate_bollinger_bands, calculate_atr, calculate_sma, calculate_rsi,
+    calculate_support_resistance, calculate_sma_sweep, calculate_rsi_sweep, calculate_bollinger_sweep
+)
+
+def display_technical_analysis(symbol, chart_width=DEFAULT_CHART_WIDTH):
+    df = get_historical_data(symbol)
+    if df.empty:
+        st.warning(f"No historical data available for {symbol}")
+        return
+
+    # Indicators come from the shared graph, so anything the strategies already computed
+    # for this symbol and data version is reused rather than recalculated
+    indicators = indicator_graph.frame(symbol, df, ['rsi_14', 'sma_20', 'sma_50'])
+    df = df.assign(
+        RSI=indicators['rsi_14'],
+        SMA_20=indicators['sma_20'],
+        SMA_50=indicators['sma_50'],
+    )
 
-def calculate_macd(data, fast=12, slow=26, signal=9):
-    """Calculate MACD (Moving Average Convergence/Divergence) and its signal line."""
-    fast_ema = data.ewm(span=fast, adjust=False).mean()
-    slow_ema = data.ewm(span=slow, adjust=False).mean()
-    macd_line = fast_ema - slow_ema
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    macd_hist = macd_line - signal_line
-    return macd_line, signal_line, macd_hist
-
-def calculate_bollinger_bands(data, window=20, num_std=2):
-    """Calculate Bollinger Bands (upper and lower bands) for the given window."""
-    rolling_mean = data.rolling(window).mean()
-    rolling_std = data.rolling(window).std()
-    upper_band = rolling_mean + num_std * rolling_std
-    lower_band = rolling_mean - num_std * rolling_std
-    return rolling_mean, upper_band, lower_band
-
-def calculate_atr(df, period=14):
-    """Calculate Average True Range for volatility measurement."""
-    high_low = df['High'] - df['Low']
-    high_close = (df['High'] - df['Close'].shift(1)).abs()
-    low_close = (df['Low'] - df['Close'].shift(1)).abs()
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    atr = true_range.rolling(window=period).mean()
-    return atr
-
-def calculate_sma(data, window):
-    """Calculate Simple Moving Average"""
-    return data.rolling(window=window).mean()
-
-def calculate_rsi(data, periods=14):
-    """Calculate Relative Strength Index"""
-    delta = data.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-def calculate_support_resistance(df, window=20):
-    """Calculate support and resistance levels"""
-    highs = df['High'].rolling(window=window).max()
-    lows = df['Low'].rolling(window=window).min()
-    return lows, highs
-
-def display_technical_analysis(symbol):
-    # modules/trading_strategy.py (within TradingStrategy.get_technical_signals)
-    df = get_historical_data(self.symbol)
-    # ... existing RSI, SMA calculations ...
-    df['RSI'] = calculate_rsi(df['Close'])
-    df['SMA_20'] = calculate_sma(df['Close'], 20)
-    df['SMA_50'] = calculate_sma(df['Close'], 50)
-
-    # Calculate MACD and Bollinger Bands for additional insight
-    macd_line, signal_line, macd_hist = calculate_macd(df['Close'])
-    df['MACD'] = macd_line
-    df['MACD_signal'] = signal_line
-    df['MACD_hist'] = macd_hist
-
-    rolling_mean, upper_band, lower_band = calculate_bollinger_bands(df['Close'])
-    df['Bollinger_Mid'] = rolling_mean
-    df['Bollinger_Upper'] = upper_band
-    df['Bollinger_Lower'] = lower_band
-
-    # Calculate ATR for volatility-based stop-loss/take-profit
-    df['ATR'] = calculate_atr(df)
-
-    # Support and resistance
-    support, resistance = calculate_support_resistance(df)
+    # Zooming re-slices the bars here, so a narrower range is drawn in more detail
+    visible = df
+    if len(df) > 1:
+        first, last = df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()
+        start, end = st.slider(
+            "Chart range",
+            min_value=first,
+            max_value=last,
+            value=(first, last),
+            key=f"chart_range_{symbol}"
+        )
+        visible = df.loc[start:end]
+
+    # Cap the points per trace by what the chart width can actually show
+    candles = downsample_ohlc(visible, max_points(chart_width, CANDLE_PIXELS))
+    line_points = max_points(chart_width, LINE_PIXELS)
+    sma_20 = downsample_line(visible['SMA_20'], line_points)
+    sma_50 = downsample_line(visible['SMA_50'], line_points)
 
     # Create interactive chart
     fig = go.Figure()
 
     # Candlestick chart
     fig.add_trace(go.Candlestick(
-        x=df.index,
-        open=df['Open'],
-        high=df['High'],
-        low=df['Low'],
-        close=df['Close'],
+        x=candles.index,
+        open=candles['Open'],
+        high=candles['High'],
+        low=candles['Low'],
+        close=candles['Close'],
         name='OHLC'
     ))
 
     # Add moving averages
     fig.add_trace(go.Scatter(
-        x=df.index,
-        y=df['SMA_20'],
+        x=sma_20.index,
+        y=sma_20,
         name='SMA 20',
         line=dict(color='blue')
     ))
 
     fig.add_trace(go.Scatter(
-        x=df.index,
-        y=df['SMA_50'],
+        x=sma_50.index,
+        y=sma_50,
         name='SMA 50',
         line=dict(color='orange')
     ))
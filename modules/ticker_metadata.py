@@ -0,0 +1,118 @@
+import logging
+import threading
+from time import monotonic
+from modules.market_data import get_provider
+from modules.single_flight import SingleFlight
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# How long each info field stays valid; one info fetch refreshes every field at once
+FIELD_TTLS = {
+    # Company profile
+    'longName': 7 * DAY,
+    'sector': 7 * DAY,
+    'industry': 7 * DAY,
+    # Market-driven values
+    'marketCap': 15 * MINUTE,
+    'forwardPE': HOUR,
+    'fiftyTwoWeekHigh': HOUR,
+    'fiftyTwoWeekLow': HOUR,
+    # Analyst coverage
+    'recommendationKey': DAY,
+    'recommendationMean': DAY,
+    'numberOfAnalystOpinions': DAY,
+    'targetMeanPrice': DAY,
+    'targetHighPrice': DAY,
+    'targetLowPrice': DAY,
+    # Estimates
+    'revenueEstimate': DAY,
+    'forwardEps': DAY,
+}
+DEFAULT_FIELD_TTL = 15 * MINUTE
+
+CALENDAR_TTL = DAY
+NEWS_TTL = 15 * MINUTE
+
+class TickerMetadataCache:
+    """Per-symbol info, calendar and news shared by every lookup, with per-field TTLs"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.info = {}
+        self.calendars = {}
+        self.news = {}
+        self.flights = SingleFlight()
+
+    def _fresh(self, store, key, ttl):
+        with self.lock:
+            entry = store.get(key)
+        if entry is not None and monotonic() - entry[0] <= ttl:
+            return entry
+        return None
+
+    def _fetch(self, store, kind, symbol, fetch):
+        # Concurrent misses for the same symbol wait on a single provider call
+        def load():
+            value = fetch(symbol)
+            with self.lock:
+                store[symbol] = (monotonic(), value)
+            return value
+        return self.flights.do((kind, symbol), load)
+
+    def get_info(self, symbol, fields=None):
+        """Return info for a symbol, refetching only when one of the requested fields has expired"""
+        if fields:
+            ttl = min(FIELD_TTLS.get(field, DEFAULT_FIELD_TTL) for field in fields)
+        else:
+            ttl = DEFAULT_FIELD_TTL
+
+        entry = self._fresh(self.info, symbol, ttl)
+        if entry is not None:
+            info = entry[1]
+        else:
+            logging.info(f"Fetching ticker info for {symbol}")
+            info = self._fetch(self.info, 'info', symbol, get_provider().info) or {}
+
+        if fields:
+            return {field: info[field] for field in fields if field in info}
+        return dict(info)
+
+    def get_calendar(self, symbol):
+        """Return the earnings calendar for a symbol"""
+        entry = self._fresh(self.calendars, symbol, CALENDAR_TTL)
+        if entry is not None:
+            return entry[1]
+        return self._fetch(self.calendars, 'calendar', symbol, get_provider().calendar)
+
+    def get_news(self, symbol):
+        """Return the provider's news items for a symbol"""
+        entry = self._fresh(self.news, symbol, NEWS_TTL)
+        if entry is not None:
+            return entry[1]
+        return self._fetch(self.news, 'news', symbol, get_provider().news) or []
+
+    def invalidate(self, symbol=None):
+        """Drop cached metadata for one symbol, or for all symbols"""
+        with self.lock:
+            for store in (self.info, self.calendars, self.news):
+                if symbol is None:
+                    store.clear()
+                else:
+                    store.pop(symbol, None)
+
+# Shared by the dashboard, paper trading and the trading strategies
+ticker_metadata = TickerMetadataCache()
+
+def get_ticker_info(symbol, fields=None):
+    """Return cached info fields for a symbol"""
+    return ticker_metadata.get_info(symbol, fields)
+
+def get_ticker_calendar(symbol):
+    """Return the cached earnings calendar for a symbol"""
+    return ticker_metadata.get_calendar(symbol)
+
+def get_ticker_news(symbol):
+    """Return cached provider news for a symbol"""
+    return ticker_metadata.get_news(symbol)
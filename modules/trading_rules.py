@@ -0,0 +1,46 @@
+# Entry and exit rules shared by TradingStrategy, the universe screener and historical replays.
+# Each rule is an expression over signal names compiled by modules.rule_engine, so the same
+# definition evaluates one symbol's signal dict, a universe-wide signal table or a symbol's
+# bar-by-bar history. Thresholds are named parameters: override them per call, or compare
+# many variants side by side with Rule.variants.
+from modules.rule_engine import compile_rules
+
+# Relaxed entry conditions for simulation mode
+ENTRY_PARAMS = {
+    'equity_rsi': 40,        # Relaxed RSI condition
+    'support_band': 1.05,    # Relaxed support condition
+    'options_rsi': 45,       # Relaxed RSI condition
+    'max_put_call': 0.8,     # Relaxed flow strength
+}
+
+ENTRY_RULES = compile_rules({
+    # Technical part of the equity setup; price above SMA 20 is the alternative trend condition
+    'equity_technical': "(oversold or rsi < equity_rsi) and "
+                        "(near_support or price <= support * support_band) and "
+                        "(uptrend or price > sma_20)",
+    # Technical part of the options setup
+    'options_technical': "oversold or rsi < options_rsi",
+    # Both setups require a bullish analyst rating
+    'analyst_approves': "bullish",
+    # Options-flow part of the options setup
+    'options_flow': "bullish_flow and (strong_flow or put_call_ratio < max_put_call) and high_activity",
+}, ENTRY_PARAMS)
+
+EXIT_PARAMS = {
+    'trail_trigger': 10,     # Start trailing the stop once profit exceeds 10%
+    'trail_factor': 0.95,    # Trail stop to 5% below current price
+    'max_loss_percent': 20,  # Overridden with the strategy's max_loss_pct
+}
+
+EXIT_RULES = compile_rules({
+    'trail_stop': "pnl_percent > trail_trigger",
+    # Hit stop-loss or take-profit or max loss threshold
+    'equity_exit': "price <= stop_loss or price >= take_profit or pnl_percent <= -max_loss_percent",
+    # Options P&L against the dollar stop-loss and take-profit of the strategy
+    'options_exit': "unrealized_pnl <= -stop_loss or unrealized_pnl >= take_profit",
+}, EXIT_PARAMS)
+
+equity_technical = ENTRY_RULES['equity_technical']
+options_technical = ENTRY_RULES['options_technical']
+analyst_approves = ENTRY_RULES['analyst_approves']
+options_flow = ENTRY_RULES['options_flow']
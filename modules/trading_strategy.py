@@ -1,7 +1,12 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from modules.technical_analysis import calculate_rsi, calculate_sma, calculate_support_resistance
+from modules.streaming_indicators import TechnicalIndicatorState
+from modules.indicator_graph import data_version
+from modules.signal_snapshot import SignalSnapshot
+from modules.entry_pipeline import entry_pipeline_stats
+from modules.ml_scoring import ml_approved
+from modules.trading_rules import equity_technical, options_technical, analyst_approves, options_flow, EXIT_RULES, EXIT_PARAMS
 from modules.options_analysis import calculate_options_statistics, get_options_chain
 from modules.stock_data import get_historical_data
 from modules.news_analysis import get_analyst_ratings
@@ -9,6 +14,31 @@ from modules.utils import load_trades, save_trades
 from modules.options_strategies import OptionsStrategy
 import logging
 
+# Returned when technical signals cannot be computed
+EMPTY_TECHNICAL_SIGNALS = {
+    'price': None,
+    'rsi': None,
+    'oversold': False,
+    'overbought': False,
+    'uptrend': False,
+    'support': None,
+    'resistance': None,
+    'near_support': False,
+    'near_resistance': False,
+    'sma_20': None,
+    'sma_50': None,
+    'macd': None,
+    'macd_signal_line': None,
+    'macd_bullish': False,
+    'bollinger_upper': None,
+    'bollinger_lower': None,
+    'bollinger_width': None,
+    'below_bollinger': False,
+    'above_bollinger': False,
+    'atr': None,
+    'atr_percent': None
+}
+
 class TradingStrategy:
     def __init__(self, symbol, initial_capital=100000):
         self.symbol = symbol
@@ -16,60 +46,85 @@ class TradingStrategy:
         self.current_capital = initial_capital
         self.positions = []
         self.max_loss_pct = 0.20  # 20% max loss
+        self.indicator_state = TechnicalIndicatorState(symbol)  # Updated bar by bar across calls
+        self.primed_indicators = None  # Set by PortfolioManager from the universe-wide panel
+        self.signal_snapshot = None  # Signals for the current bar, replaced when the bars change
+
+    def prime_indicators(self, latest):
+        """Hand over latest indicator values computed elsewhere, e.g. by the portfolio-wide panel"""
+        self.primed_indicators = latest
+
+    def _latest_indicators(self, df):
+        """Latest indicator values for the bars in df"""
+        primed = self.primed_indicators
+        if (primed is not None and primed['timestamp'] == df.index[-1]
+                and primed['price'] == float(df['Close'].iloc[-1])):
+            return primed
+
+        # Only bars the indicator state has not seen yet are processed
+        return self.indicator_state.sync(df).latest()
+
+    def snapshot(self):
+        """Signals for the current bar, computed at most once and shared by every caller until the next bar"""
+        df = get_historical_data(self.symbol)
+        bar_key = data_version(df)
+        snapshot = self.signal_snapshot
+        if snapshot is None or snapshot.bar_key != bar_key:
+            snapshot = SignalSnapshot(
+                bar_key,
+                technical=lambda: self._technical_signals(df),
+                options=self._options_signals,
+                analyst=self._analyst_signals
+            )
+            self.signal_snapshot = snapshot
+        return snapshot
 
     def get_technical_signals(self):
+        """Technical signals for the current bar (read-only, shared through the signal snapshot)"""
+        return self.snapshot().technical
+
+    def get_analyst_signals(self):
+        """Analyst signals for the current bar (read-only, shared through the signal snapshot)"""
+        return self.snapshot().analyst
+
+    def get_options_signals(self):
+        """Options flow signals for the current bar (read-only, shared through the signal snapshot)"""
+        return self.snapshot().options
+
+    def _technical_signals(self, df):
         """Analyze technical indicators for trading signals"""
         try:
-            df = get_historical_data(self.symbol)
-
             # Guard clause for empty or insufficient data
             if df is None or df.empty or len(df) < 50:  # Need at least 50 data points for reliable signals
                 logging.warning(f"Insufficient historical data for {self.symbol} (got {len(df) if df is not None else 0} rows)")
-                return {
-                    'price': None,
-                    'rsi': None,
-                    'oversold': False,
-                    'overbought': False,
-                    'uptrend': False,
-                    'support': None,
-                    'resistance': None,
-                    'near_support': False,
-                    'near_resistance': False,
-                    'sma_20': None,
-                    'sma_50': None
-                }
+                return dict(EMPTY_TECHNICAL_SIGNALS)
 
             # Log data validation
             logging.info(f"Processing technical signals for {self.symbol} with {len(df)} data points")
 
-            # Calculate indicators with validation
-            df['RSI'] = calculate_rsi(df['Close'])
-            if df['RSI'].isna().all():
-                raise ValueError("RSI calculation failed")
-
-            df['SMA_20'] = calculate_sma(df['Close'], 20)
-            df['SMA_50'] = calculate_sma(df['Close'], 50)
+            latest = self._latest_indicators(df)
 
-            if df['SMA_20'].isna().all() or df['SMA_50'].isna().all():
+            # Get latest values with validation
+            current_price = latest['price']
+            current_rsi = latest['rsi']
+            sma_20 = latest['sma_20']
+            sma_50 = latest['sma_50']
+            current_macd = latest['macd']
+            current_signal = latest['macd_signal']
+            current_mid = latest['bollinger_mid']
+            current_upper = latest['bollinger_upper']
+            current_lower = latest['bollinger_lower']
+            current_atr = latest['atr']
+            support = latest['support']
+            resistance = latest['resistance']
+
+            if pd.isna(current_rsi):
+                raise ValueError("RSI calculation failed")
+            if pd.isna(sma_20) or pd.isna(sma_50):
                 raise ValueError("SMA calculation failed")
-
-            support, resistance = calculate_support_resistance(df)
-
-            if support.empty or resistance.empty:
+            if pd.isna(support) or pd.isna(resistance):
                 raise ValueError("Support/Resistance calculation failed")
-
-            # Get latest values with validation
-            current_price = df['Close'].iloc[-1] if not df['Close'].empty else None
-            current_rsi = df['RSI'].iloc[-1] if not df['RSI'].empty else None
-            sma_20 = df['SMA_20'].iloc[-1] if not df['SMA_20'].empty else None
-            sma_50 = df['SMA_50'].iloc[-1] if not df['SMA_50'].empty else None
-            current_macd = df['MACD'].iloc[-1]
-            current_signal = df['MACD_signal'].iloc[-1]
-            current_upper = df['Bollinger_Upper'].iloc[-1]
-            current_lower = df['Bollinger_Lower'].iloc[-1]
-            current_atr = df['ATR'].iloc[-1]
-
-            if any(x is None for x in [current_price, current_rsi, sma_20, sma_50]):
+            if pd.isna(current_price):
                 raise ValueError("Failed to get current indicator values")
 
             signals = {
@@ -78,10 +133,10 @@ class TradingStrategy:
                 'oversold': current_rsi < 30,
                 'overbought': current_rsi > 70,
                 'uptrend': sma_20 > sma_50,
-                'support': support.iloc[-1] if not support.empty else None,
-                'resistance': resistance.iloc[-1] if not resistance.empty else None,
-                'near_support': current_price <= support.iloc[-1] * 1.02 if not support.empty else False,
-                'near_resistance': current_price >= resistance.iloc[-1] * 0.98 if not resistance.empty else False,
+                'support': support,
+                'resistance': resistance,
+                'near_support': current_price <= support * 1.02,
+                'near_resistance': current_price >= resistance * 0.98,
                 'sma_20': sma_20,
                 'sma_50': sma_50,
                 # New indicators:
@@ -90,7 +145,7 @@ class TradingStrategy:
                 'macd_bullish': current_macd > current_signal,         # True if MACD above signal (bullish momentum)
                 'bollinger_upper': current_upper,
                 'bollinger_lower': current_lower,
-                'bollinger_width': ((current_upper - current_lower) / rolling_mean.iloc[-1]) if rolling_mean.iloc[-1] != 0 else 0,
+                'bollinger_width': ((current_upper - current_lower) / current_mid) if current_mid != 0 else 0,
                 'below_bollinger': current_price < current_lower,
                 'above_bollinger': current_price > current_upper,
                 'atr': current_atr,
@@ -112,21 +167,9 @@ Technical Analysis for {self.symbol}:
 
         except Exception as e:
             logging.error(f"Error calculating technical signals for {self.symbol}: {str(e)}")
-            return {
-                'price': None,
-                'rsi': None,
-                'oversold': False,
-                'overbought': False,
-                'uptrend': False,
-                'support': None,
-                'resistance': None,
-                'near_support': False,
-                'near_resistance': False,
-                'sma_20': None,
-                'sma_50': None
-            }
+            return dict(EMPTY_TECHNICAL_SIGNALS)
 
-    def get_analyst_signals(self):
+    def _analyst_signals(self):
         """Get analyst ratings signals"""
         ratings = get_analyst_ratings(self.symbol)
 
@@ -140,7 +183,7 @@ Technical Analysis for {self.symbol}:
 
         return signals
 
-    def get_options_signals(self):
+    def _options_signals(self):
         """Analyze options flow for trading signals"""
         options_df, _ = get_options_chain(self.symbol, num_expiries=3)
         stats = calculate_options_statistics(options_df)
@@ -155,78 +198,88 @@ Technical Analysis for {self.symbol}:
         return signals
 
     def should_enter_trade(self):
-        """Determine if we should enter a trade based on signals"""
+        """Determine if we should enter a trade based on signals
+
+        Stages run from cheapest to most expensive and stop at the first one that rules the
+        symbol out: local technical predicates, analyst ratings, the options chain, the ML model.
+        The ML features include options flow, so with a model attached, stage 4 pulls the options
+        chain for an equity setup too.
+        """
         try:
-            tech_signals = self.get_technical_signals()
+            snapshot = self.snapshot()
+            tech_signals = snapshot.technical
 
             # Skip if we don't have valid technical data
             if tech_signals['price'] is None:
                 logging.warning(f"Skipping trade check for {self.symbol} - No valid price data")
                 return None
 
-            options_signals = self.get_options_signals()
-            analyst_signals = self.get_analyst_signals()
-
-            # If an ML model is available, use it to evaluate the trade
-            if hasattr(self, 'ml_model') and self.ml_model:
-                # Prepare feature vector for prediction (example features)
-                features = [
-                    tech_signals['rsi'],
-                    tech_signals['sma_20'] - tech_signals['sma_50'],   # trend strength
-                    tech_signals['macd'] - tech_signals['macd_signal_line'],  # MACD histogram
-                    options_signals['put_call_ratio'],
-                    1 if options_signals['bullish_flow'] else 0,
-                    analyst_signals['mean_rating']
-                ]
-            prob = self.ml_model.predict_proba([features])[0][1]  # probability of positive outcome
-            logging.info(f"ML model confidence for {self.symbol}: {prob:.2f}")
-
-            if prob < 0.5:
-                # If predicted success probability is below 50%, skip this trade signal
-                logging.info(f"ML model suggests low success probability for {self.symbol}, skipping trade")
+            current_price = tech_signals['price']
+
+            # Stage 1: technical preconditions of both setups, computed from local bars
+            equity_setup = bool(equity_technical(tech_signals))
+            if not entry_pipeline_stats.record('technical', equity_setup or options_technical(tech_signals)):
+                logging.info(f"{self.symbol} fails technical preconditions, skipping analyst and options lookups")
                 return None
 
-            current_price = tech_signals['price']
+            # Stage 2: analyst ratings, required by both setups
+            analyst_signals = snapshot.analyst
+            if not entry_pipeline_stats.record('analyst', analyst_approves(analyst_signals)):
+                logging.info(f"{self.symbol} lacks a bullish analyst rating, skipping options lookup")
+                return None
+
+            # Stage 3: options chain, only needed when the equity setup did not already match
+            if equity_setup:
+                trade_type = 'equity'
+            else:
+                if not entry_pipeline_stats.record('options', options_flow(snapshot.options)):
+                    return None
+                trade_type = 'options'
 
-            # Log analysis for debugging
             logging.info(f"Analyzing {self.symbol} at ${current_price:.2f}")
             logging.info(f"Technical Indicators: RSI={tech_signals['rsi']:.2f}, Trend={'Up' if tech_signals['uptrend'] else 'Down'}")
-            logging.info(f"Options Flow: {'Bullish' if options_signals['bullish_flow'] else 'Bearish'}")
+            if 'options' in snapshot.computed():
+                # Only reported once fetched; logging must not be what pulls the options chain
+                logging.info(f"Options Flow: {'Bullish' if snapshot.options['bullish_flow'] else 'Bearish'}")
             logging.info(f"Analyst Rating: {analyst_signals['recommendation']}")
 
-            # Relaxed entry conditions for simulation mode
-            equity_conditions = (
-                (tech_signals['oversold'] or tech_signals['rsi'] < 40) and  # Relaxed RSI condition
-                (tech_signals['near_support'] or current_price <= tech_signals['support'] * 1.05) and  # Relaxed support condition
-                (tech_signals['uptrend'] or tech_signals['price'] > tech_signals.get('sma_20', 0)) and  # Alternative trend condition
-                analyst_signals['bullish']  # Keep analyst requirement
-            )
-
-            # Relaxed options conditions for simulation mode
-            options_conditions = (
-                (tech_signals['oversold'] or tech_signals['rsi'] < 45) and  # Relaxed RSI condition
-                options_signals['bullish_flow'] and  # Keep options flow requirement
-                (options_signals['strong_flow'] or options_signals['put_call_ratio'] < 0.8) and  # Relaxed flow strength
-                options_signals['high_activity'] and  # Keep activity requirement
-                analyst_signals['bullish']  # Keep analyst requirement
-            )
+            # Stage 4: the ML model, if one is attached
+            if not self.ml_approves():
+                return None
 
-            if equity_conditions:
-                logging.info(f"Found equity trade signal for {self.symbol}")
-                return 'equity'
-            elif options_conditions:
-                logging.info(f"Found options trade signal for {self.symbol}")
-                return 'options'
-
-            return None
+            logging.info(f"Found {trade_type} trade signal for {self.symbol}")
+            return trade_type
 
         except Exception as e:
             logging.error(f"Error evaluating trade signals for {self.symbol}: {str(e)}")
             return None
 
+    def ml_features(self, snapshot):
+        """Feature vector the ML model scores a trade on"""
+        tech_signals = snapshot.technical
+        options_signals = snapshot.options
+        return [
+            tech_signals['rsi'],
+            tech_signals['sma_20'] - tech_signals['sma_50'],   # trend strength
+            tech_signals['macd'] - tech_signals['macd_signal_line'],  # MACD histogram
+            options_signals['put_call_ratio'],
+            1 if options_signals['bullish_flow'] else 0,
+            snapshot.analyst['mean_rating']
+        ]
+
+    def ml_approves(self):
+        """Whether the attached ML model (if any) rates the trade likely to succeed
+
+        Scored exactly as the screener scores a batch, so a feature that is missing or not a
+        number rules the trade out instead of reaching the model.
+        """
+        return self.symbol in ml_approved({self.symbol: self}, [self.symbol])
+
     def execute_trade(self, trade_type):
         """Execute a paper trade based on signals"""
-        tech_signals = self.get_technical_signals()
+        # The same snapshot should_enter_trade just evaluated, so nothing is recomputed here
+        snapshot = self.snapshot()
+        tech_signals = snapshot.technical
         current_price = tech_signals['price']
 
         # Calculate position size (risk 2% of capital per trade)
@@ -243,24 +296,12 @@ Technical Analysis for {self.symbol}:
 
         # Record signals for ML training
         signal_data = {
-            'technical': tech_signals,
-            'options': self.get_options_signals(),
-            'analyst': self.get_analyst_signals(),
+            'technical': dict(tech_signals),
+            'options': dict(snapshot.options),
+            'analyst': dict(snapshot.analyst),
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
 
-        # Flatten the signal data for logging
-        flat_signals = {}
-        for category, sig_dict in signal_data.items():
-            if isinstance(sig_dict, dict):
-                for key, value in sig_dict.items():
-                    flat_signals[f"{category}_{key}"] = value
-            else:
-                # timestamp or any non-dict entry
-                flat_signals[category] = sig_dict
-
-        trade['signals'] = flat_signals
-
         if trade_type == 'equity':
             quantity = int(risk_amount / current_price)
             if quantity < 1:
@@ -272,8 +313,8 @@ Technical Analysis for {self.symbol}:
                 'action': 'buy',
                 'quantity': quantity,
                 'entry_price': current_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
+                'stop_loss': stop_loss_price,
+                'take_profit': take_profit_price,
                 'status': 'open',
                 'entry_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'exit_date': None,
@@ -287,8 +328,7 @@ Technical Analysis for {self.symbol}:
             options_strategy = OptionsStrategy(self.symbol)
 
             # Get current market conditions
-            tech_signals = self.get_technical_signals()
-            options_signals = self.get_options_signals()
+            options_signals = snapshot.options
 
             # Select and create the best strategy for current conditions
             strategy_details = options_strategy.select_best_strategy(
@@ -304,7 +344,7 @@ Technical Analysis for {self.symbol}:
             trade = options_strategy.execute_strategy(strategy_details)
             if trade:
                 # Attach signals record
-                trade['signals'] = signal_data  # (we will flatten this later)
+                trade['signals'] = signal_data
                 # Dynamic stop-loss and take-profit based on conditions
                 if tech_signals['uptrend'] and options_signals['bullish_flow']:
                     # Bullish scenario: allow more risk, aim for higher profit
@@ -322,20 +362,6 @@ Technical Analysis for {self.symbol}:
             if not trade:
                 return None
 
-            # Add additional trade information
-            trade['signals'] = signal_data
-
-            # Calculate and set stop loss and take profit based on max loss tolerance
-            trade['stop_loss'] = trade['max_loss'] * 0.8  # Exit at 80% of max loss
-            trade['take_profit'] = trade['max_profit'] * 0.5  # Take profit at 50% of max profit
-
-            # Save the trade
-            trades = load_trades()
-            trades.append(trade)
-            save_trades(trades)
-
-            return trade
-
         # Save the trade
         trades = load_trades()
         trades.append(trade)
@@ -349,70 +375,83 @@ Technical Analysis for {self.symbol}:
         updated_trades = []
 
         for trade in trades:
-            if trade['status'] == 'open':
-                current_price = self.get_technical_signals()['price']
-
-               if trade['status'] == 'open' and trade['type'] == 'equity':
+            if trade['status'] == 'open' and trade['symbol'] == self.symbol:
+                if trade['type'] == 'equity':
+                    # Every open trade in this symbol reads the same snapshot
                     current_price = self.get_technical_signals()['price']
                     entry = trade['entry_price']
                     pnl_percent = (current_price - entry) / entry * 100
 
-                    # Update trailing stop-loss if profit exceeds 10%
-                    if pnl_percent > 10:
-                        new_stop = current_price * 0.95  # trail stop to 5% below current price
+                    position = {
+                        'price': current_price,
+                        'pnl_percent': pnl_percent,
+                        'stop_loss': trade['stop_loss'],
+                        'take_profit': trade['take_profit'],
+                    }
+
+                    # Update trailing stop-loss once profit exceeds the trail trigger
+                    if EXIT_RULES['trail_stop'](position):
+                        new_stop = current_price * EXIT_PARAMS['trail_factor']
                         if new_stop > trade['stop_loss']:
-                            trade['stop_loss'] = new_stop  # move stop-loss up to protect profit
+                            trade['stop_loss'] = position['stop_loss'] = new_stop  # move stop-loss up to protect profit
 
                     # Exit conditions: hit stop-loss or take-profit or max loss threshold
-                    if current_price <= trade['stop_loss'] or current_price >= trade['take_profit'] or pnl_percent <= - (self.max_loss_pct * 100):
+                    if EXIT_RULES['equity_exit'](position, max_loss_percent=self.max_loss_pct * 100):
                         trade['status'] = 'closed'
                         trade['exit_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                         trade['exit_price'] = current_price
                         trade['profit'] = (current_price - entry) * trade['quantity']
 
                 elif trade['type'] == 'options':
-                    # Get current options chain
-                    options_df, _ = get_options_chain(self.symbol, num_expiries=1)
-
-                    if not options_df.empty:
-                        # Calculate current value of the strategy
-                        current_value = 0
-                        for leg in trade['legs']:
-                            current_option = options_df[
-                                (options_df['strike'] == leg['strike']) &
-                                (options_df['optionType'] == leg['type']) &
-                                (options_df['expiration'] == trade['expiration'])
-                            ]
-
-                            if not current_option.empty:
-                                quantity = leg.get('quantity', 1)
-                                if leg['action'] == 'buy':
-                                    current_value -= current_option.iloc[0]['lastPrice'] * 100 * quantity
-                                else:  # sell
-                                    current_value += current_option.iloc[0]['lastPrice'] * 100 * quantity
-
-                        # Calculate unrealized P&L
-                        initial_value = sum(
-                            (leg.get('quantity', 1) * leg['premium'] * 100 *
-                             (1 if leg['action'] == 'sell' else -1))
-                            for leg in trade['legs']
-                        )
-
-                        unrealized_pnl = current_value - initial_value
-
-                        # Check exit conditions
-                        if (unrealized_pnl <= -trade['stop_loss'] or  # Stop loss hit
-                            unrealized_pnl >= trade['take_profit']):  # Take profit hit
-
-                            trade['status'] = 'closed'
-                            trade['exit_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                            trade['profit'] = unrealized_pnl
+                    unrealized_pnl = self.calculate_options_pnl(trade)
+
+                    # Check exit conditions: stop loss or take profit hit
+                    if unrealized_pnl is not None and EXIT_RULES['options_exit']({
+                        'unrealized_pnl': unrealized_pnl,
+                        'stop_loss': trade['stop_loss'],
+                        'take_profit': trade['take_profit'],
+                    }):
+
+                        trade['status'] = 'closed'
+                        trade['exit_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        trade['profit'] = unrealized_pnl
 
             updated_trades.append(trade)
 
         save_trades(updated_trades)
         return updated_trades
 
+    def calculate_options_pnl(self, trade):
+        """Unrealized P&L of an open options trade at current option prices, or None without a chain"""
+        # Get current options chain
+        options_df, _ = get_options_chain(self.symbol, num_expiries=1)
+        if options_df.empty:
+            return None
+
+        # Calculate current value of the strategy
+        current_value = 0
+        for leg in trade['legs']:
+            current_option = options_df[
+                (options_df['strike'] == leg['strike']) &
+                (options_df['optionType'] == leg['type']) &
+                (options_df['expiration'] == trade['expiration'])
+            ]
+
+            if not current_option.empty:
+                quantity = leg.get('quantity', 1)
+                if leg['action'] == 'buy':
+                    current_value -= current_option.iloc[0]['lastPrice'] * 100 * quantity
+                else:  # sell
+                    current_value += current_option.iloc[0]['lastPrice'] * 100 * quantity
+
+        initial_value = sum(
+            (leg.get('quantity', 1) * leg['premium'] * 100 *
+             (1 if leg['action'] == 'sell' else -1))
+            for leg in trade['legs']
+        )
+
+        return current_value - initial_value
+
     def get_trading_stats(self):
         """Calculate trading statistics for analysis"""
         trades = load_trades()
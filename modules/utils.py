@@ -1,6 +1,7 @@
 import json
 import os
 from pathlib import Path
+import numpy as np
 
 def load_trades():
     """Load trades from JSON file"""
@@ -16,10 +17,16 @@ def load_trades():
     except:
         return []
 
+def _json_value(value):
+    """Plain Python value for NumPy scalars, e.g. the bools of indicator comparisons in trade signals"""
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 def save_trades(trades):
     """Save trades to JSON file"""
     trades_file = Path("data/paper_trades.json")
     trades_file.parent.mkdir(exist_ok=True)
     
     with open(trades_file, 'w') as f:
-        json.dump(trades, f, indent=4)
+        json.dump(trades, f, indent=4, default=_json_value)
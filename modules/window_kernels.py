@@ -0,0 +1,233 @@
+import numpy as np
+
+# Rows per cumulative-sum pass; sums restart from zero at every chunk
+CHUNK_ROWS = 1 << 16
+
+# Standard deviations over windows up to this length are reduced directly from each window,
+# which costs one pass over the data per row of the window
+DIRECT_STD_MAX_WINDOW = 8
+
+# Longer windows take the sum-of-squares shortcut, restarting the cumulative sums every this many
+# rows so they stay close to the size of a single window's. Rows where the shortcut could still
+# lose more than STD_TOLERANCE of the variance to cancellation (nearly flat windows) are reduced
+# directly instead.
+STD_BLOCK_ROWS = 1 << 10
+STD_TOLERANCE = 1e-10
+
+def _prepare(values, window, fill=0.0):
+    """Float64 values with NaNs replaced by `fill`, plus the number of NaNs in each trailing window"""
+    if window < 1:
+        raise ValueError(f"Window must be at least 1, got {window}")
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    if not missing.any():
+        # Nothing to fill or count, which is most bar histories; no kernel writes to its input
+        return values, np.zeros(values.shape, dtype=np.int64)
+    return np.where(missing, fill, values), _trailing_count(missing, window)
+
+def _trailing_count(flags, window):
+    counts = np.cumsum(flags, axis=0)
+    counts[window:] = counts[window:] - counts[:-window]
+    return counts
+
+def _window_sums(values, window):
+    """Sum of each trailing window from a single cumulative sum, O(n) whatever the window"""
+    sums = np.cumsum(values, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums
+
+def _mask_incomplete(result, missing, window):
+    # Same as pandas rolling(window): NaN until the window is full and free of NaNs
+    result[:window - 1] = np.nan
+    result[missing > 0] = np.nan
+    return result
+
+def _by_chunk(clean, window, kernel, centre=True):
+    """Run a window kernel over row chunks, each overlapping the previous by window - 1 rows"""
+    # Short chunks centred on their own mean keep the cumulative sums small, which is what
+    # keeps the sum-of-squares variance accurate over multi-year minute-bar histories
+    if clean.shape[0] == 0:
+        # No rows to chunk; the kernel still gives the result its shape (e.g. rows x windows)
+        return kernel(clean, np.zeros(clean.shape[1:]))
+    result = None
+    for start in range(0, clean.shape[0], CHUNK_ROWS):
+        lead = min(start, window - 1)
+        segment = clean[start - lead:start + CHUNK_ROWS]
+        offset = segment.mean(axis=0) if centre else np.zeros(segment.shape[1:])
+        chunk = kernel(segment - offset, offset)[lead:]
+        if result is None:
+            result = np.empty((clean.shape[0],) + chunk.shape[1:])
+        result[start:start + CHUNK_ROWS] = chunk
+    return result
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` rows, down axis 0"""
+    clean, missing = _prepare(values, window)
+
+    def kernel(centred, centre):
+        return _window_sums(centred, window) / window + centre
+
+    return _mask_incomplete(_by_chunk(clean, window, kernel), missing, window)
+
+def _direct_std(values, window, ddof):
+    """Standard deviation of every full trailing window, from the deviations of each row from its window's mean"""
+    result = np.full(values.shape, np.nan)
+    count = values.shape[0] - window + 1
+    if count <= 0:
+        return result
+    mean = _window_sums(values, window)[window - 1:] / window
+    squares = np.zeros(mean.shape)
+    deviation = np.empty(mean.shape)
+    # One pass per position in the window, without materializing rows x window
+    for lag in range(window):
+        np.subtract(values[lag:lag + count], mean, out=deviation)
+        np.multiply(deviation, deviation, out=deviation)
+        squares += deviation
+    result[window - 1:] = np.sqrt(squares / (window - ddof))
+    return result
+
+def _sum_of_squares_std(values, window, ddof):
+    """Standard deviation of every trailing window from cumulative sums, re-reducing rows the sums cannot resolve"""
+    rows = values.shape[0]
+    block = max(STD_BLOCK_ROWS, window)
+    blocks = max(-(-rows // block), 1)
+    padded = np.zeros((window - 1 + blocks * block,) + values.shape[1:])
+    padded[window - 1:window - 1 + rows] = values
+    if rows:
+        # Padding repeats the edge rows; zeros would drag the first and last blocks' centres off the data
+        padded[:window - 1] = values[0]
+        padded[window - 1 + rows:] = values[-1]
+    # Each block carries the window - 1 rows before it, so every window ending in it lies within it,
+    # and is centred on its own mean; the sums restart at every block and all blocks run at once
+    spans = np.lib.stride_tricks.sliding_window_view(padded, block + window - 1, axis=0)[::block]
+    spans = np.moveaxis(spans, -1, 1)
+    centred = spans - spans.mean(axis=1, keepdims=True)
+
+    sums = np.cumsum(centred, axis=1)
+    squares = np.cumsum(centred * centred, axis=1)
+    window_sums = sums[:, window - 1:].copy()
+    window_sums[:, 1:] -= sums[:, :-window]
+    variance = squares[:, window - 1:].copy()
+    variance[:, 1:] -= squares[:, :-window]
+    window_sums *= window_sums
+    window_sums /= window
+    variance -= window_sums
+
+    # Differencing the cumulative sums costs about their own rounding error, which swamps the
+    # variance of a window that is nearly flat compared with the rest of the block
+    suspect = squares[:, window - 1:] * (4 * np.finfo(np.float64).eps / STD_TOLERANCE) > variance
+    where = np.nonzero(suspect)
+    if where[0].size:
+        windows = np.lib.stride_tricks.sliding_window_view(centred, window, axis=1)[where]
+        deviations = windows - windows.mean(axis=-1, keepdims=True)
+        # A window of identical values has no spread at all, whatever rounding left behind
+        flat = (windows == windows[..., :1]).all(axis=-1)
+        variance[where] = np.where(flat, 0.0, (deviations * deviations).sum(axis=-1))
+
+    np.maximum(variance, 0.0, out=variance)
+    variance /= window - ddof
+    return np.sqrt(variance, out=variance).reshape((blocks * block,) + values.shape[1:])[:rows]
+
+def _changed(clean):
+    """Whether each row differs from the one before it"""
+    changed = np.zeros(clean.shape, dtype=bool)
+    changed[1:] = clean[1:] != clean[:-1]
+    return changed
+
+def rolling_std(values, window, ddof=1):
+    """Trailing standard deviation (sample by default, like pandas)
+
+    Short windows are reduced directly, longer ones from cumulative sums of block-centred values.
+    """
+    clean, missing = _prepare(values, window)
+    if window <= ddof:
+        return np.full(clean.shape, np.nan)
+
+    if window > DIRECT_STD_MAX_WINDOW:
+        # The kernel centres each of its blocks itself, and zeroes flat windows among the rows it re-reduces
+        def kernel(segment, centre):
+            return _sum_of_squares_std(segment, window, ddof)
+
+        return _mask_incomplete(_by_chunk(clean, window, kernel, centre=False), missing, window)
+
+    def kernel(centred, centre):
+        return _direct_std(centred, window, ddof)
+
+    std = _by_chunk(clean, window, kernel)
+    # A window of identical values has no spread at all, whatever rounding left behind
+    if window > 1:
+        std[_trailing_count(_changed(clean), window - 1) == 0] = 0.0
+    return _mask_incomplete(std, missing, window)
+
+def _rolling_extreme(values, window, ufunc, fill):
+    clean, missing = _prepare(values, window, fill)
+    rows = clean.shape[0]
+    result = np.full(clean.shape, np.nan)
+    if rows < window:
+        return result
+
+    # van Herk/Gil-Werman: split the series into blocks of `window`, take running extremes forwards
+    # and backwards within each block, and every window is covered by one suffix and one prefix.
+    # Three passes over the data whatever the window length, and all of them vectorized.
+    padded_rows = -(-rows // window) * window
+    padded = np.full((padded_rows,) + clean.shape[1:], fill)
+    padded[:rows] = clean
+    blocks = padded.reshape((-1, window) + clean.shape[1:])
+
+    prefix = ufunc.accumulate(blocks, axis=1).reshape(padded.shape)
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+
+    result[window - 1:] = ufunc(suffix[:rows - window + 1], prefix[window - 1:rows])
+    return _mask_incomplete(result, missing, window)
+
+def rolling_max(values, window):
+    """Trailing maximum over `window` rows, O(n) whatever the window"""
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+def rolling_min(values, window):
+    """Trailing minimum over `window` rows, O(n) whatever the window"""
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+def _window_lengths(windows):
+    windows = np.atleast_1d(np.asarray(windows, dtype=np.int64))
+    if windows.size == 0 or windows.min() < 1:
+        raise ValueError("Windows must be a non-empty list of lengths of at least 1")
+    return windows
+
+def _trailing_sums_many(values, windows):
+    """Trailing sums of a 1-D array for every window at once (rows x windows) from one cumulative sum"""
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)[:, None]
+    return sums[ends] - sums[np.maximum(ends - windows[None, :], 0)]
+
+def _mask_incomplete_many(result, flags, windows):
+    missing = _trailing_sums_many(flags.astype(np.float64), windows)
+    rows = np.arange(result.shape[0])[:, None]
+    result[(rows < windows[None, :] - 1) | (missing > 0)] = np.nan
+    return result
+
+def rolling_mean_many(values, windows, centre=True):
+    """Trailing means of a 1-D series for many window lengths in one pass, one column per window
+
+    Pass centre=False for values such as gains or losses, where a run of zeros must average to exactly zero.
+    """
+    windows = _window_lengths(windows)
+    values = np.asarray(values, dtype=np.float64)
+    flags = np.isnan(values)
+    clean = np.where(flags, 0.0, values)
+
+    def kernel(centred, centre):
+        return _trailing_sums_many(centred, windows) / windows[None, :] + centre
+
+    return _mask_incomplete_many(_by_chunk(clean, int(windows.max()), kernel, centre), flags, windows)
+
+def rolling_std_many(values, windows, ddof=1):
+    """Trailing standard deviations of a 1-D series for many window lengths, one column per window"""
+    windows = _window_lengths(windows)
+    values = np.asarray(values, dtype=np.float64)
+    # Column by column: rolling_std re-reduces nearly flat windows, which a single sweep over
+    # shared cumulative sums cannot, and with its blocked sums it is no slower
+    std = np.empty((values.shape[0], windows.size))
+    for column, window in enumerate(windows):
+        std[:, column] = rolling_std(values, int(window), ddof)
+    return std
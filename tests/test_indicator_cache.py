@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import indicator_graph as graph_module
+from modules import indicator_cache
+from modules.indicator_cache import IndicatorResultCache, INDICATOR_CACHE_MIN_ROWS, last_bar_complete, result_key
+from modules.indicator_graph import IndicatorGraph
+
+def daily_bars(rows=252, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    index = pd.date_range('2024-01-02', periods=rows, freq='B', tz='America/New_York')
+    return pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1000,
+    }, index=index)
+
+def graph_with(cache):
+    """A graph with the shared node definitions but its own memo and result cache"""
+    graph = IndicatorGraph(result_cache=cache)
+    graph.nodes = dict(graph_module.indicator_graph.nodes)
+    return graph
+
+@pytest.fixture
+def cache(tmp_path):
+    return IndicatorResultCache(root=tmp_path / 'indicators', max_bytes=64 * 1024 * 1024)
+
+def test_year_of_daily_bars_is_cached():
+    assert len(daily_bars()) >= INDICATOR_CACHE_MIN_ROWS
+
+def test_results_are_read_back_instead_of_recomputed(cache, monkeypatch):
+    df = daily_bars()
+    first = graph_with(cache).get('AAPL', df, 'rsi_14')
+    assert list(cache.root.glob('*/*.parquet'))
+
+    # A fresh graph (e.g. the next process) must not recompute a persisted node
+    def fail(*args):
+        raise AssertionError("node recomputed despite a cached result")
+    graph = graph_with(cache)
+    deps, _, persist = graph.nodes['rsi_14']
+    graph.nodes['rsi_14'] = (deps, fail, persist)
+
+    second = graph.get('AAPL', df, 'rsi_14')
+    np.testing.assert_allclose(second.to_numpy(), first.to_numpy(), equal_nan=True)
+    assert second.index.equals(df.index)
+
+def test_changed_bars_miss_the_cache(cache):
+    df = daily_bars()
+    graph_with(cache).get('AAPL', df, 'sma_20')
+    moved = df.copy()
+    moved.iloc[-1, moved.columns.get_loc('Close')] += 5
+    expected = moved['Close'].rolling(20).mean().to_numpy()
+    np.testing.assert_allclose(graph_with(cache).get('AAPL', moved, 'sma_20').to_numpy(), expected, equal_nan=True)
+
+def test_short_histories_skip_the_cache(cache):
+    graph_with(cache).get('AAPL', daily_bars(INDICATOR_CACHE_MIN_ROWS - 1), 'rsi_14')
+    assert not list(cache.root.glob('*/*.parquet'))
+
+def test_formula_changes_change_every_key(monkeypatch):
+    key = result_key('digest', 'rsi_14')
+    monkeypatch.setattr(indicator_cache, 'FORMULA_FINGERPRINT', 'edited formulas')
+    assert result_key('digest', 'rsi_14') != key
+
+def test_results_over_an_in_progress_bar_stay_in_memory(cache):
+    df = daily_bars()
+    today = pd.Timestamp.now(tz='America/New_York').normalize()
+    df.index = pd.date_range(end=today, periods=len(df), freq='D', tz='America/New_York')
+
+    graph_with(cache).get('AAPL', df, 'rsi_14')
+    assert not list(cache.root.glob('*/*.parquet'))
+
+    graph_with(cache).get('AAPL', df.iloc[:-1], 'rsi_14')
+    assert list(cache.root.glob('*/*.parquet'))
+
+def test_last_bar_complete_uses_the_bar_spacing():
+    index = pd.date_range('2024-03-04 09:30', periods=10, freq='5min', tz='America/New_York')
+    df = pd.DataFrame({'Close': np.arange(10.0)}, index=index)
+    assert not last_bar_complete(df, now=index[-1] + pd.Timedelta(minutes=4))
+    assert last_bar_complete(df, now=index[-1] + pd.Timedelta(minutes=5))
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.indicator_panel import MACDStateCache, latest_indicator_table
+from modules.indicators import calculate_macd
+
+def _bars(seed, rows=300):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    index = pd.bdate_range('2023-01-02', periods=rows, tz='America/New_York')
+    return pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+        'Volume': np.full(rows, 1000),
+    }, index=index)
+
+def test_carried_macd_matches_pandas_with_staggered_resume_rows():
+    frames = {symbol: _bars(seed) for seed, symbol in enumerate(['AAA', 'BBB', 'CCC', 'DDD'])}
+    states = MACDStateCache()
+
+    # The previous scan saw each symbol up to a different bar, so their states resume at
+    # different rows of this scan's panel
+    seen = {'AAA': 290, 'BBB': 295, 'CCC': 297, 'DDD': 299}
+    latest_indicator_table({symbol: df.iloc[:seen[symbol]] for symbol, df in frames.items()}, states=states)
+    table = latest_indicator_table(frames, states=states)
+
+    for symbol, df in frames.items():
+        macd_line, signal_line, macd_hist = calculate_macd(df['Close'])
+        assert table.loc[symbol, 'macd'] == pytest.approx(macd_line.iloc[-1], abs=1e-6)
+        assert table.loc[symbol, 'macd_signal'] == pytest.approx(signal_line.iloc[-1], abs=1e-6)
+        assert table.loc[symbol, 'macd_hist'] == pytest.approx(macd_hist.iloc[-1], abs=1e-6)
+
+def test_carried_macd_state_is_dropped_when_history_is_rewritten():
+    frames = {'AAA': _bars(1)}
+    states = MACDStateCache()
+    latest_indicator_table({'AAA': frames['AAA'].iloc[:-5]}, states=states)
+
+    # A split adjusts every earlier close, so the carried state no longer lines up
+    adjusted = frames['AAA'].copy()
+    adjusted[['Open', 'High', 'Low', 'Close']] /= 2
+    table = latest_indicator_table({'AAA': adjusted}, states=states)
+
+    macd_line, signal_line, _ = calculate_macd(adjusted['Close'])
+    assert table.loc['AAA', 'macd'] == pytest.approx(macd_line.iloc[-1], abs=1e-6)
+    assert table.loc['AAA', 'macd_signal'] == pytest.approx(signal_line.iloc[-1], abs=1e-6)
@@ -0,0 +1,174 @@
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+import pytest
+from modules import bar_store, market_data, stock_data
+from modules.market_data import MarketDataProvider, RecordingProvider, ReplayProvider, set_provider
+
+class SyntheticProvider(MarketDataProvider):
+    """Daily bars for any window, counting how often history is requested"""
+
+    def __init__(self):
+        self.calls = []
+
+    def history(self, symbol, start, end, interval):
+        self.calls.append((symbol, start, end))
+        index = pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(),
+                               tz='America/New_York', inclusive='left')
+        close = 100 + np.cumsum(np.ones(len(index)))
+        return pd.DataFrame({
+            'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+            'Volume': np.full(len(index), 1000),
+        }, index=index)
+
+    def info(self, symbol):
+        return {'symbol': symbol}
+
+    def calendar(self, symbol):
+        return None
+
+    def news(self, symbol):
+        return []
+
+    def option_expirations(self, symbol):
+        return ()
+
+    def option_chain(self, symbol, expiration):
+        return pd.DataFrame(), pd.DataFrame()
+
+    def sp500_constituents(self):
+        return pd.DataFrame({'Symbol': ['AAPL', 'MSFT'], 'Security': ['Apple Inc.', 'Microsoft']})
+
+@pytest.fixture
+def isolated_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(bar_store, 'BAR_STORE_DIR', tmp_path / 'bars')
+    stock_data._history_cache.clear()
+    yield tmp_path
+    stock_data._history_cache.clear()
+    set_provider(None)
+
+def test_provider_requires_every_data_method():
+    with pytest.raises(TypeError):
+        MarketDataProvider()
+
+def test_record_then_replay_returns_full_period(isolated_data):
+    live = SyntheticProvider()
+    expected = len(live.history('AAPL', stock_data.get_period_start('1y', pd.Timestamp.now()), pd.Timestamp.now(), '1d'))
+
+    # A symbol already in the bar store must still be recorded in full
+    set_provider(live)
+    stock_data.get_historical_data('AAPL', delay_between_retries=0)
+    assert bar_store.load_bars('AAPL', '1d') is not None
+    stock_data._history_cache.clear()
+
+    recorder = RecordingProvider(live, root=isolated_data / 'replay')
+    set_provider(recorder)
+    live.calls.clear()
+    recorded = stock_data.get_historical_data('AAPL', delay_between_retries=0)
+    assert len(live.calls) == 1
+    assert len(recorded) == expected
+    stock_data._history_cache.clear()
+
+    set_provider(ReplayProvider(root=isolated_data / 'replay'))
+    replayed = stock_data.get_historical_data('AAPL', delay_between_retries=0)
+    # The replay window is measured from the manifest time, written just after the fetch,
+    # so at most the first recorded bar can fall outside it
+    assert len(replayed) >= expected - 1
+    assert replayed.index[-1] == recorded.index[-1]
+    assert np.allclose(replayed['Close'].to_numpy(), recorded['Close'].loc[replayed.index[0]:].to_numpy())
+
+class DroppingProvider(SyntheticProvider):
+    """Grouped downloads that silently leave out symbols, the way yf.download reports failures"""
+
+    def __init__(self, drops):
+        super().__init__()
+        self.drops = list(drops)
+        self.downloads = []
+
+    def download(self, symbols, start, end, interval):
+        self.downloads.append(list(symbols))
+        dropped = self.drops.pop(0) if self.drops else set()
+        return {symbol: self.history(symbol, start, end, interval) for symbol in symbols if symbol not in dropped}
+
+def test_grouped_download_refetches_symbols_that_came_back_empty(isolated_data, monkeypatch):
+    throttles = []
+    monkeypatch.setattr(stock_data.market_data_limiter, 'record_throttle', lambda: throttles.append(1))
+    provider = DroppingProvider([{'MSFT'}])
+    set_provider(provider)
+
+    frames = stock_data.get_historical_data_many(['AAPL', 'MSFT', 'NVDA'], delay_between_retries=0)
+
+    assert provider.downloads == [['AAPL', 'MSFT', 'NVDA'], ['MSFT']]
+    assert all(len(df) >= 50 for df in frames.values())
+    # Losing one symbol is a per-symbol failure, not the provider pushing back
+    assert throttles == []
+
+def test_grouped_download_with_nothing_back_slows_the_limiter(isolated_data, monkeypatch):
+    throttles = []
+    monkeypatch.setattr(stock_data.market_data_limiter, 'record_throttle', lambda: throttles.append(1))
+    provider = DroppingProvider([{'AAPL', 'MSFT'}])
+    set_provider(provider)
+
+    frames = stock_data.get_historical_data_many(['AAPL', 'MSFT'], delay_between_retries=0)
+
+    assert throttles == [1]
+    assert provider.downloads == [['AAPL', 'MSFT'], ['AAPL', 'MSFT']]
+    assert all(len(df) >= 50 for df in frames.values())
+
+class MetadataProvider(SyntheticProvider):
+    def calendar(self, symbol):
+        return {'Earnings Date': [date(2024, 7, 30)], 'Revenue Estimate': np.float64(8.5e10)}
+
+    def news(self, symbol):
+        return [{'title': f"{symbol} beats", 'published': datetime(2024, 7, 31, 16, 5)}]
+
+    def option_expirations(self, symbol):
+        return ('2024-08-16', '2024-09-20')
+
+def test_recorded_metadata_replays_as_json(isolated_data):
+    root = isolated_data / 'replay'
+    live = MetadataProvider()
+    recorder = RecordingProvider(live, root=root)
+    for method in ('info', 'calendar', 'news', 'option_expirations'):
+        getattr(recorder, method)('AAPL')
+    recorder.sp500_constituents()
+
+    assert not list(root.rglob('*.pkl'))
+    replay = ReplayProvider(root=root)
+    assert replay.info('AAPL') == live.info('AAPL')
+    assert replay.calendar('AAPL') == live.calendar('AAPL')
+    assert replay.news('AAPL') == live.news('AAPL')
+    assert replay.option_expirations('AAPL') == live.option_expirations('AAPL')
+    pd.testing.assert_frame_equal(replay.sp500_constituents(), live.sp500_constituents())
+
+def test_replay_serves_the_recorded_constituents_not_the_local_snapshot(isolated_data, monkeypatch):
+    monkeypatch.setattr(stock_data, 'SP500_SNAPSHOT_PATH', isolated_data / 'sp500.csv')
+    monkeypatch.setattr(stock_data, '_sp500_snapshot', pd.DataFrame({'Symbol': ['LOCAL'], 'Security': ['Local']}))
+    RecordingProvider(SyntheticProvider(), root=isolated_data / 'replay').sp500_constituents()
+
+    set_provider(ReplayProvider(root=isolated_data / 'replay'))
+    assert stock_data.get_sp500_stocks()['Symbol'].tolist() == ['AAPL', 'MSFT']
+
+class UnreachableConstituents(SyntheticProvider):
+    def __init__(self):
+        super().__init__()
+        self.scrapes = 0
+
+    def sp500_constituents(self):
+        self.scrapes += 1
+        raise ConnectionError("Wikipedia unreachable")
+
+def test_failed_first_constituent_scrape_waits_before_retrying(isolated_data, monkeypatch):
+    monkeypatch.setattr(stock_data, 'SP500_SNAPSHOT_PATH', isolated_data / 'sp500.csv')
+    monkeypatch.setattr(stock_data, '_sp500_snapshot', None)
+    monkeypatch.setattr(stock_data, '_sp500_last_refresh', None)
+    provider = UnreachableConstituents()
+    set_provider(provider)
+
+    assert stock_data.get_sp500_stocks(max_retries=1).empty
+    assert stock_data.get_sp500_stocks(max_retries=1).empty
+    assert provider.scrapes == 1
+
+    monkeypatch.setattr(stock_data, '_sp500_last_refresh', stock_data.datetime.now() - stock_data.SP500_REFRESH_RETRY)
+    stock_data.get_sp500_stocks(max_retries=1)
+    assert provider.scrapes == 2
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from modules.entry_pipeline import entry_pipeline_stats
+from modules.ml_scoring import ml_approved
+from modules.trading_strategy import TradingStrategy
+
+class RsiModel:
+    """Success probability rising with the first feature; rejects rows with a negative second feature"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, features):
+        self.calls += 1
+        if (features[:, 1] < 0).any():
+            raise ValueError("negative trend")
+        p = 1 / (1 + np.exp(-(features[:, 0] - 50) / 5))
+        return np.column_stack([1 - p, p])
+
+class StubStrategy:
+    def __init__(self, rsi, ml_model, trend=0.0):
+        self.rsi = rsi
+        self.trend = trend
+        self.ml_model = ml_model
+
+    def snapshot(self):
+        return None
+
+    def ml_features(self, snapshot):
+        if self.rsi == 'error':
+            raise KeyError('rsi')
+        return [self.rsi, self.trend, 0.0, 0.8, 1, 2.0]
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    entry_pipeline_stats.reset()
+    yield
+    entry_pipeline_stats.reset()
+
+def universe(model):
+    return {f"S{i}": StubStrategy(30 + 5 * i, model) for i in range(8)}
+
+def test_one_call_for_all_candidates():
+    model = RsiModel()
+    strategies = universe(model)
+    approved = ml_approved(strategies, list(strategies))
+    assert model.calls == 1
+    assert approved == {symbol for symbol, strategy in strategies.items() if strategy.rsi >= 50}
+    assert entry_pipeline_stats.summary()['ml']['evaluated'] == len(strategies)
+
+def test_symbols_without_model_pass_unscored():
+    strategies = {'A': StubStrategy(10, None)}
+    assert ml_approved(strategies, ['A']) == {'A'}
+
+@pytest.mark.parametrize('bad', [None, float('nan'), 'error'])
+def test_bad_features_rule_out_only_their_symbol(bad):
+    model = RsiModel()
+    strategies = universe(model)
+    expected = ml_approved(strategies, list(strategies))
+    strategies['BAD'] = StubStrategy(bad, model)
+    assert ml_approved(strategies, list(strategies)) == expected
+
+def test_model_failure_on_one_row_rules_out_only_that_symbol():
+    model = RsiModel()
+    strategies = universe(model)
+    expected = ml_approved(strategies, list(strategies))
+    strategies['NEG'] = StubStrategy(90, model, trend=-1.0)
+    assert ml_approved(strategies, list(strategies)) == expected
+
+class FeatureStrategy(TradingStrategy):
+    """A real strategy whose feature row is fixed"""
+
+    def __init__(self, symbol, features, ml_model):
+        super().__init__(symbol)
+        self.features = features
+        self.ml_model = ml_model
+
+    def snapshot(self):
+        return None
+
+    def ml_features(self, snapshot):
+        return self.features
+
+@pytest.mark.parametrize('bad', [None, float('nan')])
+def test_single_strategy_rejects_bad_features_before_the_model(bad):
+    model = RsiModel()
+    assert not FeatureStrategy('BAD', [bad, 0.0, 0.0, 0.8, 1, 2.0], model).ml_approves()
+    assert model.calls == 0
+    assert entry_pipeline_stats.summary()['ml'] == {'evaluated': 1, 'passed': 0, 'pass_rate': 0.0}
+
+def test_single_strategy_scores_like_the_batch():
+    model = RsiModel()
+    for rsi in (30, 49, 50, 80):
+        strategy = FeatureStrategy('S', [rsi, 0.0, 0.0, 0.8, 1, 2.0], model)
+        assert strategy.ml_approves() == (rsi >= 50)
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+from modules import portfolio_manager, trading_strategy
+from modules.portfolio_manager import PortfolioManager
+from modules.trading_strategy import TradingStrategy
+
+class PricedStrategy(TradingStrategy):
+    """A strategy whose current price is fixed instead of coming from the bar store"""
+
+    def __init__(self, symbol, price):
+        super().__init__(symbol)
+        self.price = price
+
+    def get_technical_signals(self):
+        return {'price': self.price}
+
+def option_chain(last_price):
+    return pd.DataFrame({
+        'strike': [100.0], 'optionType': ['call'], 'expiration': ['2026-11-20'], 'lastPrice': [last_price],
+    })
+
+@pytest.fixture
+def trades(monkeypatch):
+    store = [
+        {'symbol': 'AAA', 'type': 'equity', 'status': 'open', 'entry_price': 100.0, 'quantity': 10,
+         'stop_loss': 95.0, 'take_profit': 115.0},
+        {'symbol': 'BBB', 'type': 'options', 'status': 'open', 'expiration': '2026-11-20',
+         'stop_loss': 500.0, 'take_profit': 1000.0, 'max_loss': 500.0,
+         'legs': [{'strike': 100.0, 'type': 'call', 'action': 'buy', 'premium': 2.0, 'quantity': 1}]},
+        {'symbol': 'AAA', 'type': 'equity', 'status': 'closed', 'entry_price': 90.0, 'quantity': 5,
+         'exit_price': 100.0, 'profit': 50.0, 'stop_loss': 85.0, 'take_profit': 100.0},
+    ]
+
+    def save(updated):
+        store[:] = updated
+
+    monkeypatch.setattr(trading_strategy, 'load_trades', lambda: [dict(trade) for trade in store])
+    monkeypatch.setattr(trading_strategy, 'save_trades', save)
+    monkeypatch.setattr(portfolio_manager, 'load_trades', lambda: [dict(trade) for trade in store])
+    monkeypatch.setattr(trading_strategy, 'get_options_chain', lambda symbol, num_expiries=1: (option_chain(3.5), None))
+    return store
+
+def manager(prices):
+    pm = PortfolioManager.__new__(PortfolioManager)
+    pm.initial_capital = pm.available_capital = 100000
+    pm.trading_strategies = {symbol: PricedStrategy(symbol, price) for symbol, price in prices.items()}
+    return pm
+
+def test_monitor_portfolio_closes_through_monitor_positions(trades):
+    pm = manager({'AAA': 94.0, 'BBB': 100.0})
+    summary = pm.monitor_portfolio()
+
+    assert [trade['status'] for trade in trades] == ['closed', 'open', 'closed']
+    assert trades[0]['profit'] == pytest.approx(-60.0)
+    assert summary['total_positions'] == 2
+    assert [trade['symbol'] for trade in summary['open_positions']] == ['BBB']
+    assert summary['total_profit_loss'] == pytest.approx(-10.0)
+    assert pm.available_capital == pytest.approx(100000 + 940.0)
+
+def test_portfolio_stats_value_options_like_monitor_positions(trades):
+    pm = manager({'AAA': 102.0, 'BBB': 100.0})
+    stats = pm.get_portfolio_stats()
+
+    # +20 on the open shares, plus the options leg valued by the same helper monitor_positions exits on
+    options_pnl = pm.trading_strategies['BBB'].calculate_options_pnl(trades[1])
+    assert options_pnl is not None
+    assert stats['unrealized_pnl'] == pytest.approx(20.0 + options_pnl)
+
+def test_options_without_a_chain_add_nothing(trades, monkeypatch):
+    monkeypatch.setattr(trading_strategy, 'get_options_chain', lambda symbol, num_expiries=1: (pd.DataFrame(), None))
+    pm = manager({'AAA': 100.0, 'BBB': 100.0})
+    assert pm.get_portfolio_stats()['unrealized_pnl'] == 0
+    pm.monitor_portfolio()
+    assert trades[1]['status'] == 'open'
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+import requests
+from modules import market_data
+from modules.rate_limiter import MARKET_DATA_BATCH_COST, TokenBucket, is_rate_limit_error
+
+class YFRateLimitError(Exception):
+    """Stand-in with the name of yfinance's throttling exception"""
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} Client Error", response=response)
+
+def test_rate_limit_errors_match_on_type_and_status():
+    assert is_rate_limit_error(YFRateLimitError())
+    assert is_rate_limit_error(_http_error(429))
+    assert is_rate_limit_error(Exception("Too Many Requests. Rate limited. Try after a while."))
+
+def test_429_elsewhere_in_a_message_is_not_throttling():
+    assert not is_rate_limit_error(_http_error(404))
+    assert not is_rate_limit_error(ValueError("No data for 4290.T"))
+    assert not is_rate_limit_error(ValueError("Price 429.50 outside the band"))
+
+def test_grouped_download_is_charged_the_batch_cost(monkeypatch):
+    bucket = TokenBucket(rate=2, burst=5)
+    monkeypatch.setattr(market_data, 'market_data_limiter', bucket)
+    monkeypatch.setattr(market_data.yf, 'download', lambda symbols, **kwargs: pd.DataFrame())
+
+    market_data.YFinanceProvider().download([f"S{i}" for i in range(100)], None, None, '1d')
+
+    # One chunk of 100 symbols must not push the shared bucket 95 tokens into debt
+    assert bucket.tokens == pytest.approx(5 - MARKET_DATA_BATCH_COST, abs=0.1)
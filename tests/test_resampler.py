@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import resampler
+from modules.bars import compact_bars
+from modules.resampler import ResampleCache, resample_bars
+
+def _daily_bars(rows=400):
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    index = pd.bdate_range('2023-01-02', periods=rows, tz='America/New_York')
+    return compact_bars(pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+        'Volume': np.arange(rows) + 1000,
+    }, index=index))
+
+@pytest.fixture
+def resampled_rows(monkeypatch):
+    """Number of base bars each resample_bars call aggregates"""
+    rows = []
+    def counting(df, interval):
+        rows.append(len(df))
+        return resample_bars(df, interval)
+    monkeypatch.setattr(resampler, 'resample_bars', counting)
+    return rows
+
+def test_rolling_window_reuses_cached_buckets(resampled_rows):
+    bars = _daily_bars()
+    cache = ResampleCache()
+    cache.resample('AAPL', '1d', bars.iloc[:250], '1wk')
+
+    # Each day a one-year period gains a bar at the end and loses one at the start
+    for day in range(1, 12):
+        resampled_rows.clear()
+        base = bars.iloc[day:250 + day]
+        df = cache.resample('AAPL', '1d', base, '1wk')
+
+        pd.testing.assert_frame_equal(df, resample_bars(base, '1wk'))
+        assert sum(resampled_rows) < 15
+
+def test_rewritten_history_is_resampled_from_scratch(resampled_rows):
+    bars = _daily_bars()
+    cache = ResampleCache()
+    cache.resample('AAPL', '1d', bars.iloc[:250], '1wk')
+
+    adjusted = bars.iloc[1:251].copy()
+    adjusted['Close'] /= 2
+    resampled_rows.clear()
+    df = cache.resample('AAPL', '1d', adjusted, '1wk')
+
+    pd.testing.assert_frame_equal(df, resample_bars(adjusted, '1wk'))
+    assert resampled_rows == [250]
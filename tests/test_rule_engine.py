@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules import screener
+from modules.indicator_graph import indicator_graph
+from modules.rule_engine import Rule, RuleError
+from modules.screener import technical_signal_history
+from modules.trading_rules import equity_technical, options_technical, options_flow
+from modules.trading_strategy import TradingStrategy
+
+def signal_table(rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(90, 110, rows)
+    return pd.DataFrame({
+        'price': price,
+        'rsi': rng.uniform(20, 60, rows),
+        'oversold': rng.random(rows) < 0.2,
+        'near_support': rng.random(rows) < 0.3,
+        'support': price * rng.uniform(0.9, 1.0, rows),
+        'uptrend': rng.random(rows) < 0.5,
+        'sma_20': price * rng.uniform(0.95, 1.05, rows),
+    })
+
+def test_variants_match_separate_calls():
+    signals = signal_table()
+    variants = {
+        'default': {},
+        'loose': {'equity_rsi': 50, 'support_band': 1.08},
+        'strict': {'equity_rsi': 30},
+        'tight_support': {'support_band': 1.0},
+    }
+    table = equity_technical.variants(signals, variants)
+    assert list(table.columns) == list(variants)
+    for label, params in variants.items():
+        pd.testing.assert_series_equal(table[label], equity_technical(signals, **params), check_names=False)
+    assert table['loose'].sum() > table['default'].sum() > table['strict'].sum()
+
+def test_variants_of_parameters_the_rule_does_not_read():
+    signals = signal_table()
+    table = options_technical.variants(signals, {'a': {'equity_rsi': 10}, 'b': {}})
+    assert (table['a'] == table['b']).all()
+
+def test_scalar_and_or_short_circuit():
+    # A missing put/call ratio only matters when the flow is not strong
+    strong = {'bullish_flow': True, 'strong_flow': True, 'put_call_ratio': None, 'high_activity': True}
+    assert options_flow(strong) is True
+    assert options_flow({**strong, 'bullish_flow': False, 'strong_flow': False}) is False
+    with pytest.raises(TypeError):
+        options_flow({**strong, 'strong_flow': False})
+
+def test_unsupported_syntax():
+    with pytest.raises(RuleError):
+        Rule('call', "abs(rsi) < 30")
+    with pytest.raises(RuleError):
+        Rule('broken', "rsi <")
+
+@pytest.fixture
+def uncached_graph(monkeypatch):
+    monkeypatch.setattr(indicator_graph, 'result_cache', None)
+    yield
+    indicator_graph.clear()
+
+def daily_bars(rows=160, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+    index = pd.date_range('2025-01-02', periods=rows, freq='B', tz='America/New_York')
+    return pd.DataFrame({
+        'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close, 'Volume': 1000,
+    }, index=index)
+
+def test_history_replay_matches_the_per_bar_rules(uncached_graph):
+    df = daily_bars()
+    history = technical_signal_history('TEST', df)
+    assert history.index[0] == df.index[49]  # SMA 50 is the slowest signal to fill
+
+    replayed = {rule: rule(history) for rule in (equity_technical, options_technical)}
+    assert all(result.any() and not result.all() for result in replayed.values())
+
+    # The live path, one bar at a time
+    strategy = TradingStrategy('TEST')
+    for end in range(50, len(df) + 1):
+        signals = strategy._technical_signals(df.iloc[:end])
+        bar = df.index[end - 1]
+        for column in screener.BOOLEAN_SIGNALS:
+            assert bool(history.at[bar, column]) == signals[column], (bar, column)
+        for rule, result in replayed.items():
+            assert bool(result.at[bar]) == rule(signals), (bar, rule.name)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.entry_pipeline import entry_pipeline_stats
+from modules.screener import screen_universe, technical_signal_frame
+from modules.signal_snapshot import SignalSnapshot
+from modules.trading_strategy import TradingStrategy
+
+class StubStrategy(TradingStrategy):
+    """A strategy whose signals come from fixed dicts; None for a lookup makes it raise"""
+
+    def __init__(self, symbol, technical, analyst, options):
+        super().__init__(symbol)
+        self.signals = {'technical': technical, 'analyst': analyst, 'options': options}
+
+    def _source(self, kind):
+        def fetch():
+            if self.signals[kind] is None:
+                raise ConnectionError(f"{kind} lookup failed")
+            return self.signals[kind]
+        return fetch
+
+    def snapshot(self):
+        if self.signal_snapshot is None:
+            self.signal_snapshot = SignalSnapshot('bar', technical=self._source('technical'),
+                                                  options=self._source('options'), analyst=self._source('analyst'))
+        return self.signal_snapshot
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    entry_pipeline_stats.reset()
+    yield
+    entry_pipeline_stats.reset()
+
+def indicator_table(symbols, rng):
+    """Latest indicators scattered around the thresholds of the entry rules"""
+    price = rng.uniform(90, 110, len(symbols))
+    sma_20 = price * rng.uniform(0.97, 1.03, len(symbols))
+    mid = sma_20
+    std = rng.uniform(0.5, 3, len(symbols))
+    return pd.DataFrame({
+        'timestamp': pd.Timestamp('2026-10-16 15:59', tz='America/New_York'),
+        'price': price,
+        'rsi': rng.uniform(20, 60, len(symbols)),
+        'sma_20': sma_20,
+        'sma_50': sma_20 * rng.uniform(0.97, 1.03, len(symbols)),
+        'macd': rng.normal(0, 1, len(symbols)),
+        'macd_signal': rng.normal(0, 1, len(symbols)),
+        'bollinger_mid': mid,
+        'bollinger_upper': mid + 2 * std,
+        'bollinger_lower': mid - 2 * std,
+        'atr': rng.uniform(0.5, 3, len(symbols)),
+        'support': price * rng.uniform(0.93, 1.0, len(symbols)),
+        'resistance': price * rng.uniform(1.0, 1.07, len(symbols)),
+    }, index=pd.Index(symbols, name='symbol'))
+
+def analyst_signals(rng):
+    recommendation = rng.choice(['BUY', 'STRONG_BUY', 'HOLD', 'SELL'])
+    return {
+        'recommendation': recommendation, 'mean_rating': float(rng.uniform(1, 5)),
+        'bullish': recommendation in ('BUY', 'STRONG_BUY'), 'bearish': recommendation == 'SELL',
+        'target_price': 120.0,
+    }
+
+def options_signals(rng):
+    return {
+        'bullish_flow': bool(rng.random() < 0.7), 'strong_flow': bool(rng.random() < 0.5),
+        'put_call_ratio': float(rng.uniform(0.4, 1.2)), 'high_activity': bool(rng.random() < 0.8),
+    }
+
+def universe(seed=0, symbols=60):
+    rng = np.random.default_rng(seed)
+    names = [f"S{i:02d}" for i in range(symbols)]
+    table = indicator_table(names, rng)
+    tech = technical_signal_frame(table)
+    strategies = {}
+    for symbol in names:
+        technical = {key: value.item() if hasattr(value, 'item') else value for key, value in tech.loc[symbol].items()}
+        strategies[symbol] = StubStrategy(symbol, technical, analyst_signals(rng), options_signals(rng))
+    return strategies, table
+
+def entry_decisions(strategies):
+    decisions = {}
+    for symbol, strategy in strategies.items():
+        strategy.signal_snapshot = None
+        trade_type = strategy.should_enter_trade()
+        if trade_type:
+            decisions[symbol] = trade_type
+    return decisions
+
+def screened(strategies, table):
+    for strategy in strategies.values():
+        strategy.signal_snapshot = None
+    return screen_universe(strategies, table)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_screener_matches_should_enter_trade(seed):
+    strategies, table = universe(seed)
+    expected = entry_decisions(strategies)
+    assert set(expected.values()) == {'equity', 'options'}
+    assert screened(strategies, table) == expected
+
+def test_symbols_outside_the_panel_use_their_own_signals():
+    strategies, table = universe()
+    expected = entry_decisions(strategies)
+    equity = next(symbol for symbol, trade_type in expected.items() if trade_type == 'equity')
+    options = next(symbol for symbol, trade_type in expected.items() if trade_type == 'options')
+
+    result = screened(strategies, table.drop([equity, options]))
+    assert result == expected
+    assert result[equity] == 'equity' and result[options] == 'options'
+
+def test_failed_analyst_lookup_rules_out_only_that_symbol():
+    strategies, table = universe()
+    candidate = next(iter(entry_decisions(strategies)))
+    strategies[candidate].signals['analyst'] = None
+
+    expected = entry_decisions(strategies)
+    assert candidate not in expected
+    assert screened(strategies, table) == expected
+
+def test_failed_options_chain_rules_out_only_that_symbol():
+    strategies, table = universe()
+    before = entry_decisions(strategies)
+    candidate = next(symbol for symbol, trade_type in before.items() if trade_type == 'options')
+    strategies[candidate].signals['options'] = None
+
+    expected = entry_decisions(strategies)
+    assert expected == {symbol: trade_type for symbol, trade_type in before.items() if symbol != candidate}
+    assert screened(strategies, table) == expected
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.window_kernels import (
+    CHUNK_ROWS, rolling_mean, rolling_std, rolling_max, rolling_min, rolling_mean_many, rolling_std_many
+)
+from modules.technical_analysis import calculate_sma, calculate_bollinger_bands, calculate_support_resistance
+
+KERNELS = {
+    'mean': (rolling_mean, lambda rolling: rolling.mean()),
+    'std': (rolling_std, lambda rolling: rolling.std()),
+    'max': (rolling_max, lambda rolling: rolling.max()),
+    'min': (rolling_min, lambda rolling: rolling.min()),
+}
+
+def random_walk(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 + np.cumsum(rng.normal(0, 1, rows))
+
+def with_gaps(values, seed=1):
+    values = values.copy()
+    rng = np.random.default_rng(seed)
+    values[rng.choice(len(values), size=max(len(values) // 50, 1), replace=False)] = np.nan
+    values[10:40] = np.nan  # A gap longer than most windows
+    return values
+
+def assert_matches_pandas(name, values, window, rtol=1e-9, atol=1e-9):
+    kernel, reference = KERNELS[name]
+    expected = reference(pd.Series(values).rolling(window)).to_numpy()
+    if name == 'std':
+        # pandas updates the variance online, which is itself off by ~1e-9 on small stds
+        atol = max(atol, 1e-7)
+    np.testing.assert_allclose(kernel(values, window), expected, rtol=rtol, atol=atol, equal_nan=True)
+
+@pytest.mark.parametrize('name', KERNELS)
+@pytest.mark.parametrize('window', [1, 2, 3, 14, 20, 50, 200])
+def test_matches_pandas(name, window):
+    assert_matches_pandas(name, random_walk(5000), window)
+
+@pytest.mark.parametrize('name', KERNELS)
+@pytest.mark.parametrize('window', [2, 5, 20, 60])
+def test_nan_gaps_match_pandas(name, window):
+    assert_matches_pandas(name, with_gaps(random_walk(3000)), window)
+
+@pytest.mark.parametrize('name', KERNELS)
+def test_window_longer_than_series(name):
+    kernel, _ = KERNELS[name]
+    assert_matches_pandas(name, random_walk(10), 20)
+    assert np.isnan(kernel(random_walk(10), 20)).all()
+
+@pytest.mark.parametrize('name', KERNELS)
+def test_empty_input(name):
+    kernel, _ = KERNELS[name]
+    assert kernel(np.array([]), 20).shape == (0,)
+
+def test_empty_series_through_indicators():
+    empty = pd.Series([], dtype=float)
+    assert calculate_sma(empty, 20).empty
+    assert all(band.empty for band in calculate_bollinger_bands(empty))
+    lows, highs = calculate_support_resistance(pd.DataFrame({'High': empty, 'Low': empty}))
+    assert lows.empty and highs.empty
+
+def test_empty_sweeps_keep_one_column_per_window():
+    assert rolling_mean_many(np.array([]), [5, 20]).shape == (0, 2)
+    assert rolling_std_many(np.array([]), [5, 20, 50]).shape == (0, 3)
+
+@pytest.mark.parametrize('name', KERNELS)
+@pytest.mark.parametrize('window', [2, 20, 100])
+def test_across_chunk_boundaries(name, window):
+    assert_matches_pandas(name, with_gaps(random_walk(2 * CHUNK_ROWS + 123)), window, rtol=1e-8, atol=1e-7)
+
+def test_small_windows_on_long_series():
+    values = random_walk(2_000_000)
+    for window in (2, 3, 5):
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        np.testing.assert_allclose(rolling_std(values, window)[window - 1:], windows.std(axis=-1, ddof=1),
+                                   rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(rolling_mean(values, window)[window - 1:], windows.mean(axis=-1),
+                                   rtol=1e-9, atol=1e-9)
+        # pandas' own online update drifts by ~1e-4 on near-flat windows of this series
+        assert_matches_pandas('std', values, window, rtol=1e-6, atol=1e-3)
+
+def test_long_windows_on_nearly_flat_stretches():
+    # Tiny moves far from the rest of the series' level are where summed squares cancel
+    values = random_walk(CHUNK_ROWS + 500) * 1000
+    values[2000:2600] = 5e5 + np.random.default_rng(2).normal(0, 1e-6, 600)
+    for window in (9, 20, 50):
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        np.testing.assert_allclose(rolling_std(values, window)[window - 1:], windows.std(axis=-1, ddof=1),
+                                   rtol=1e-6, atol=0)
+
+def test_flat_windows_have_zero_std():
+    values = random_walk(CHUNK_ROWS + 500)
+    values[1000:1300] = values[1000]
+    for window in (2, 20, 50, 100):
+        assert (rolling_std(values, window)[1000 + window - 1:1300] == 0).all()
+
+def test_sample_std_needs_two_rows():
+    assert np.isnan(rolling_std(random_walk(100), 1)).all()
+
+@pytest.mark.parametrize('centre', [True, False])
+def test_mean_sweep_matches_single_windows(centre):
+    values = with_gaps(random_walk(CHUNK_ROWS + 77))
+    windows = [2, 5, 20, 50]
+    sweep = rolling_mean_many(values, windows, centre=centre)
+    for column, window in enumerate(windows):
+        np.testing.assert_allclose(sweep[:, column], rolling_mean(values, window), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_std_sweep_matches_pandas():
+    values = with_gaps(random_walk(CHUNK_ROWS + 77))
+    windows = [2, 5, 20, 50, 200]
+    sweep = rolling_std_many(values, windows)
+    for column, window in enumerate(windows):
+        expected = pd.Series(values).rolling(window).std().to_numpy()
+        np.testing.assert_allclose(sweep[:, column], expected, rtol=1e-8, atol=1e-7, equal_nan=True)
+
+def test_panel_columns_are_independent():
+    panel = np.column_stack([random_walk(500, seed) for seed in range(3)])
+    for name, (kernel, reference) in KERNELS.items():
+        expected = reference(pd.DataFrame(panel).rolling(20)).to_numpy()
+        np.testing.assert_allclose(kernel(panel, 20), expected, rtol=1e-9, atol=1e-9, equal_nan=True)